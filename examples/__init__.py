@@ -0,0 +1 @@
+"""Example scripts for the MLX Multimodal Toolkit"""
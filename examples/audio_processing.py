@@ -3,19 +3,18 @@
 Examples for audio processing using Audio Language Models (ALMs)
 """
 
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from typing import Optional
 
 from src.unified_driver import UnifiedModelDriver
+from src.utils import device_memory_gb, print_stream
 from src.models import ALMs
 
 
-def basic_transcription():
+def basic_transcription(driver: Optional[UnifiedModelDriver] = None):
     """Basic audio transcription example"""
     print("=== Basic Audio Transcription ===")
     
-    driver = UnifiedModelDriver()
+    driver = driver or UnifiedModelDriver()
     model = driver.load_model(ALMs.WHISPER_LARGE_V3_MLX)
     
     audio_file = "sample_audio.wav"
@@ -31,11 +30,11 @@ def basic_transcription():
         print()
 
 
-def multilingual_transcription():
+def multilingual_transcription(driver: Optional[UnifiedModelDriver] = None):
     """Multilingual transcription example"""
     print("=== Multilingual Transcription ===")
     
-    driver = UnifiedModelDriver()
+    driver = driver or UnifiedModelDriver()
     model = driver.load_model(ALMs.WHISPER_LARGE_V3_MLX)
     
     audio_files = [
@@ -60,11 +59,11 @@ def multilingual_transcription():
             print()
 
 
-def batch_transcription():
+def batch_transcription(driver: Optional[UnifiedModelDriver] = None):
     """Batch transcription of multiple audio files"""
     print("=== Batch Transcription ===")
     
-    driver = UnifiedModelDriver()
+    driver = driver or UnifiedModelDriver()
     
     # Prepare batch inputs
     inputs = [
@@ -75,7 +74,10 @@ def batch_transcription():
     ]
     
     try:
-        transcriptions = driver.batch_process(inputs, ALMs.WHISPER_LARGE_V3_MLX)
+        # Reuse mel features cached next to each file on repeated runs
+        transcriptions = driver.batch_process(
+            inputs, ALMs.WHISPER_LARGE_V3_MLX, cache_features=True
+        )
         
         for i, (input_data, transcription) in enumerate(zip(inputs, transcriptions), 1):
             print(f"File {i}: {input_data['audio_file']}")
@@ -87,11 +89,11 @@ def batch_transcription():
         print()
 
 
-def transcription_with_timestamps():
+def transcription_with_timestamps(driver: Optional[UnifiedModelDriver] = None):
     """Transcription with word-level timestamps"""
     print("=== Transcription with Timestamps ===")
     
-    driver = UnifiedModelDriver()
+    driver = driver or UnifiedModelDriver()
     model = driver.load_model(ALMs.WHISPER_LARGE_V3_MLX)
     
     audio_file = "timestamped_audio.wav"
@@ -111,11 +113,11 @@ def transcription_with_timestamps():
         print()
 
 
-def streaming_transcription():
+def streaming_transcription(driver: Optional[UnifiedModelDriver] = None):
     """Streaming transcription (simulated)"""
     print("=== Streaming Transcription ===")
     
-    driver = UnifiedModelDriver()
+    driver = driver or UnifiedModelDriver()
     model = driver.load_model(ALMs.WHISPER_LARGE_V3_MLX)
     
     audio_file = "long_audio.wav"
@@ -124,8 +126,8 @@ def streaming_transcription():
     print("Transcription (streaming): ", end="")
     
     try:
-        for token in model.stream(audio_file=audio_file):
-            print(token, end="", flush=True)
+        # Transcribe 2 s chunks with 10 s of left and 1 s of right context
+        print_stream(model.stream_chunked(audio_file=audio_file))
         print("\n")
         
     except Exception as e:
@@ -133,11 +135,11 @@ def streaming_transcription():
         print()
 
 
-def custom_transcription_settings():
+def custom_transcription_settings(driver: Optional[UnifiedModelDriver] = None):
     """Transcription with custom settings"""
     print("=== Custom Transcription Settings ===")
     
-    driver = UnifiedModelDriver()
+    driver = driver or UnifiedModelDriver()
     
     # Custom configuration for transcription
     config = {
@@ -160,11 +162,11 @@ def custom_transcription_settings():
         print()
 
 
-def audio_analysis():
+def audio_analysis(driver: Optional[UnifiedModelDriver] = None):
     """Audio content analysis"""
     print("=== Audio Content Analysis ===")
     
-    driver = UnifiedModelDriver()
+    driver = driver or UnifiedModelDriver()
     model = driver.load_model(ALMs.WHISPER_LARGE_V3_MLX)
     
     audio_file = "conversation.wav"
@@ -215,14 +217,19 @@ def main():
     print("Supported formats: WAV, MP3, FLAC, M4A, etc.")
     print()
     
+    # Share one driver so repeated model loads hit the registry; models from
+    # earlier examples are unloaded once the loaded weights outgrow the GPU
+    driver = UnifiedModelDriver()
+    driver.set_memory_budget(device_memory_gb())
+
     try:
-        basic_transcription()
-        multilingual_transcription()
-        batch_transcription()
-        transcription_with_timestamps()
-        streaming_transcription()
-        custom_transcription_settings()
-        audio_analysis()
+        basic_transcription(driver)
+        multilingual_transcription(driver)
+        batch_transcription(driver)
+        transcription_with_timestamps(driver)
+        streaming_transcription(driver)
+        custom_transcription_settings(driver)
+        audio_analysis(driver)
         tts_example()
         
     except Exception as e:
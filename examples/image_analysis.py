@@ -3,19 +3,18 @@
 Examples for image analysis using Vision Language Models (VLMs)
 """
 
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from typing import Optional
 
 from src.unified_driver import UnifiedModelDriver
+from src.utils import device_memory_gb, print_stream
 from src.models import VLMs
 
 
-def basic_image_analysis():
+def basic_image_analysis(driver: Optional[UnifiedModelDriver] = None):
     """Basic image analysis example"""
     print("=== Basic Image Analysis ===")
     
-    driver = UnifiedModelDriver()
+    driver = driver or UnifiedModelDriver()
     model = driver.load_model(VLMs.SMOLVLM_INSTRUCT_BF16)
     
     # Example image analysis
@@ -34,11 +33,11 @@ def basic_image_analysis():
         print()
 
 
-def multiple_image_analysis():
+def multiple_image_analysis(driver: Optional[UnifiedModelDriver] = None):
     """Analyze multiple images"""
     print("=== Multiple Image Analysis ===")
     
-    driver = UnifiedModelDriver()
+    driver = driver or UnifiedModelDriver()
     model = driver.load_model(VLMs.FLORENCE_2_LARGE_FT_BF16)
     
     # Multiple images
@@ -57,12 +56,11 @@ def multiple_image_analysis():
         print()
 
 
-def image_question_answering():
+def image_question_answering(driver: Optional[UnifiedModelDriver] = None):
     """Image-based question answering"""
     print("=== Image Question Answering ===")
     
-    driver = UnifiedModelDriver()
-    model = driver.load_model(VLMs.QWEN2_5_VL_32B_INSTRUCT_BF16)
+    driver = driver or UnifiedModelDriver()
     
     image_path = "scene.jpg"
     questions = [
@@ -75,22 +73,21 @@ def image_question_answering():
     print(f"Analyzing image: {image_path}")
     print()
     
-    for i, question in enumerate(questions, 1):
-        try:
-            response = model.generate(question, images=[image_path])
-            print(f"Q{i}: {question}")
-            print(f"A{i}: {response}")
-            print()
-        except Exception as e:
-            print(f"Error with question {i}: {e}")
-            print()
+    # Batch the questions so the image is decoded only once
+    inputs = [{"prompt": question, "images": [image_path]} for question in questions]
+    responses = driver.batch_process(inputs, VLMs.QWEN2_5_VL_32B_INSTRUCT_BF16)
+
+    for i, (question, response) in enumerate(zip(questions, responses), 1):
+        print(f"Q{i}: {question}")
+        print(f"A{i}: {response}")
+        print()
 
 
-def ocr_example():
+def ocr_example(driver: Optional[UnifiedModelDriver] = None):
     """Text extraction from images (OCR)"""
     print("=== OCR Example ===")
     
-    driver = UnifiedModelDriver()
+    driver = driver or UnifiedModelDriver()
     model = driver.load_model(VLMs.OLMOCR_7B_0225_PREVIWE_BF16)
     
     image_path = "document.jpg"
@@ -108,11 +105,11 @@ def ocr_example():
         print()
 
 
-def batch_image_processing():
+def batch_image_processing(driver: Optional[UnifiedModelDriver] = None):
     """Process multiple images in batch"""
     print("=== Batch Image Processing ===")
     
-    driver = UnifiedModelDriver()
+    driver = driver or UnifiedModelDriver()
     
     # Prepare batch inputs
     inputs = [
@@ -137,11 +134,11 @@ def batch_image_processing():
         print()
 
 
-def model_comparison():
+def model_comparison(driver: Optional[UnifiedModelDriver] = None):
     """Compare different VLM models"""
     print("=== VLM Model Comparison ===")
     
-    driver = UnifiedModelDriver()
+    driver = driver or UnifiedModelDriver()
     
     models = [
         VLMs.FLORENCE_2_LARGE_FT_BF16,
@@ -157,7 +154,10 @@ def model_comparison():
     print()
     
     try:
-        results = driver.compare_models(models, prompt, images=[image_path])
+        # Quantize to 4-bit so the compared models fit in memory together
+        results = driver.compare_models(
+            models, prompt, quantize="int4", images=[image_path]
+        )
         
         for model_name, response in results.items():
             print(f"Model: {model_name}")
@@ -169,11 +169,11 @@ def model_comparison():
         print()
 
 
-def streaming_image_analysis():
+def streaming_image_analysis(driver: Optional[UnifiedModelDriver] = None):
     """Stream image analysis response"""
     print("=== Streaming Image Analysis ===")
     
-    driver = UnifiedModelDriver()
+    driver = driver or UnifiedModelDriver()
     model = driver.load_model(VLMs.QWEN2_5_VL_32B_INSTRUCT_BF16)
     
     image_path = "complex_scene.jpg"
@@ -184,8 +184,7 @@ def streaming_image_analysis():
     print("Response (streaming): ", end="")
     
     try:
-        for token in model.stream(prompt, images=[image_path]):
-            print(token, end="", flush=True)
+        print_stream(model.stream(prompt, images=[image_path]))
         print("\n")
         
     except Exception as e:
@@ -203,14 +202,19 @@ def main():
     print("or update the image paths in the examples.")
     print()
     
+    # Share one driver so repeated model loads hit the registry; models from
+    # earlier examples are unloaded once the loaded weights outgrow the GPU
+    driver = UnifiedModelDriver()
+    driver.set_memory_budget(device_memory_gb())
+
     try:
-        basic_image_analysis()
-        multiple_image_analysis()
-        image_question_answering()
-        ocr_example()
-        batch_image_processing()
-        model_comparison()
-        streaming_image_analysis()
+        basic_image_analysis(driver)
+        multiple_image_analysis(driver)
+        image_question_answering(driver)
+        ocr_example(driver)
+        batch_image_processing(driver)
+        model_comparison(driver)
+        streaming_image_analysis(driver)
         
     except Exception as e:
         print(f"Error running examples: {e}")
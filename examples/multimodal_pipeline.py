@@ -3,19 +3,19 @@
 Examples for combined multimodal processing pipelines
 """
 
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from collections import deque
+from typing import Optional
 
 from src.unified_driver import UnifiedModelDriver
+from src.utils import device_memory_gb
 from src.models import LLMs, VLMs, ALMs
 
 
-def image_to_text_pipeline():
+def image_to_text_pipeline(driver: Optional[UnifiedModelDriver] = None):
     """Image analysis followed by text processing"""
     print("=== Image to Text Pipeline ===")
     
-    driver = UnifiedModelDriver()
+    driver = driver or UnifiedModelDriver()
     
     # Load VLM for image analysis
     vlm = driver.load_model(VLMs.QWEN2_5_VL_32B_INSTRUCT_BF16)
@@ -37,15 +37,18 @@ def image_to_text_pipeline():
         
         # Step 2: Generate story from description
         print("Step 2: Generating story from description...")
+        story_cache = llm.make_prompt_cache()
         story_prompt = f"Write a short creative story based on this scene: {image_description}"
-        story = llm.generate(story_prompt, max_tokens=300)
+        story = llm.generate(story_prompt, max_tokens=300, prompt_cache=story_cache)
         print(f"Generated story: {story}")
         print()
         
-        # Step 3: Summarize the story
+        # Step 3: Summarize the story, reusing the cached story context. The
+        # cache already holds the story turn, so generate() sends the summary
+        # request as a follow-up user turn rather than a new chat
         print("Step 3: Summarizing the story...")
-        summary_prompt = f"Summarize this story in one sentence: {story}"
-        summary = llm.generate(summary_prompt, max_tokens=50)
+        summary_prompt = "Summarize this story in one sentence."
+        summary = llm.generate(summary_prompt, max_tokens=50, prompt_cache=story_cache)
         print(f"Story summary: {summary}")
         print()
         
@@ -54,11 +57,11 @@ def image_to_text_pipeline():
         print()
 
 
-def audio_to_summary_pipeline():
+def audio_to_summary_pipeline(driver: Optional[UnifiedModelDriver] = None):
     """Audio transcription followed by summarization"""
     print("=== Audio to Summary Pipeline ===")
     
-    driver = UnifiedModelDriver()
+    driver = driver or UnifiedModelDriver()
     
     # Load ALM for transcription
     alm = driver.load_model(ALMs.WHISPER_LARGE_V3_MLX)
@@ -94,11 +97,11 @@ def audio_to_summary_pipeline():
         print()
 
 
-def multimedia_content_analysis():
+def multimedia_content_analysis(driver: Optional[UnifiedModelDriver] = None):
     """Analyze multiple types of content together"""
     print("=== Multimedia Content Analysis ===")
     
-    driver = UnifiedModelDriver()
+    driver = driver or UnifiedModelDriver()
     
     # Load different models
     vlm = driver.load_model(VLMs.FLORENCE_2_LARGE_FT_BF16)
@@ -109,33 +112,52 @@ def multimedia_content_analysis():
     audio_file = "presentation_audio.wav"
     
     try:
-        # Analyze image content
-        print("Analyzing image content...")
+        # MLX runs one generation at a time, so the slide is analyzed while
+        # the audio file is decoded on a background thread; transcription then
+        # starts from the decoded samples
+        print("Analyzing image content and transcribing audio content...")
+        prefetch = alm.prefetch_audio([audio_file])
+        decoded_audio = next(prefetch)
         image_analysis = vlm.generate(
             "What information is presented in this slide? List key points.",
             images=[image_path]
         )
+        audio_transcription = alm.generate(audio_file=decoded_audio.result())
+        prefetch.close()
+
         print(f"Image analysis: {image_analysis}")
         print()
-        
-        # Transcribe audio content
-        print("Transcribing audio content...")
-        audio_transcription = alm.generate(audio_file=audio_file)
         print(f"Audio transcription: {audio_transcription[:200]}...")
         print()
         
-        # Combine and analyze
+        # Combine and analyze; the static template is tokenized once and the
+        # dynamic content is spliced in as token ids. Pieces are split before
+        # a space, never after it: BPE merges a leading space into the next
+        # word, so a trailing space would tokenize differently from the
+        # joined text
         print("Combining multimodal analysis...")
-        combined_prompt = f"""
-        Analyze this presentation based on both visual and audio content:
-        
-        Visual content: {image_analysis}
-        Audio content: {audio_transcription}
-        
-        Provide a comprehensive analysis of the presentation's effectiveness and key messages.
-        """
+        chat_prefix, chat_suffix = llm.chat_template_parts()
+        head_ids = llm.tokenize(
+            chat_prefix
+            + "Analyze this presentation based on both visual and audio content:\n\n"
+            + "Visual content:",
+            cache=True
+        )
+        mid_ids = llm.tokenize("\nAudio content:", cache=True)
+        tail_ids = llm.tokenize(
+            "\n\nProvide a comprehensive analysis of the presentation's "
+            "effectiveness and key messages." + chat_suffix,
+            cache=True
+        )
+        prompt_ids = (
+            head_ids
+            + llm.tokenize(" " + image_analysis)
+            + mid_ids
+            + llm.tokenize(" " + audio_transcription)
+            + tail_ids
+        )
         
-        combined_analysis = llm.generate(combined_prompt, max_tokens=400)
+        combined_analysis = llm.generate_from_ids(prompt_ids, max_tokens=400)
         print(f"Combined analysis: {combined_analysis}")
         print()
         
@@ -144,11 +166,11 @@ def multimedia_content_analysis():
         print()
 
 
-def interactive_multimodal_chat():
+def interactive_multimodal_chat(driver: Optional[UnifiedModelDriver] = None):
     """Interactive chat with multimodal capabilities"""
     print("=== Interactive Multimodal Chat ===")
     
-    driver = UnifiedModelDriver()
+    driver = driver or UnifiedModelDriver()
     
     # Load models
     vlm = driver.load_model(VLMs.SMOLVLM_INSTRUCT_BF16)
@@ -159,8 +181,33 @@ def interactive_multimodal_chat():
     print("Commands: 'image <path>', 'audio <path>', 'text <message>', 'quit'")
     print()
     
-    # Simulate conversation
-    conversation_history = []
+    # The LLM keeps earlier turns in its KV cache, so each turn only sends
+    # what the LLM has not seen yet. Once the cache outgrows chat_cache_limit
+    # it is rebuilt from the most recent turns instead of letting a rotating
+    # cache drop tokens the conversation state still refers to
+    chat_cache_limit = 4096
+    chat_cache = llm.make_prompt_cache()
+    history = deque(maxlen=6)
+    pending_context = []
+
+    def chat(message: str, **kwargs) -> str:
+        nonlocal chat_cache
+        # Only context produced by other models since the last turn needs to
+        # be sent; earlier turns are already cached
+        prompt = message
+        if pending_context:
+            prompt = "Context: " + "\n".join(pending_context) + f"\n\n{message}"
+            pending_context.clear()
+        turn = prompt
+
+        if llm.cached_tokens(chat_cache) > chat_cache_limit:
+            chat_cache = llm.make_prompt_cache()
+            earlier = "\n".join(f"User: {user}\nAssistant: {reply}" for user, reply in history)
+            prompt = f"Earlier conversation:\n{earlier}\n\n{prompt}"
+
+        reply = llm.generate(prompt, prompt_cache=chat_cache, **kwargs)
+        history.append((turn, reply))
+        return reply
     
     simulate_inputs = [
         ("image", "photo.jpg"),
@@ -177,23 +224,16 @@ def interactive_multimodal_chat():
                     "Describe this image briefly.",
                     images=[content]
                 )
-                conversation_history.append(f"Image: {response}")
+                pending_context.append(f"Image: {response}")
                 
             elif input_type == "audio":
                 print(f"User: [Audio message: {content}]")
                 transcription = alm.generate(audio_file=content)
-                response = llm.generate(transcription)
-                conversation_history.append(f"Audio transcription: {transcription}")
-                conversation_history.append(f"Response: {response}")
+                response = chat(transcription)
                 
             elif input_type == "text":
                 print(f"User: {content}")
-                # Include conversation history for context
-                context = "\n".join(conversation_history[-3:])  # Last 3 exchanges
-                full_prompt = f"Context: {context}\n\nUser: {content}\n\nAssistant:"
-                response = llm.generate(full_prompt, max_tokens=150)
-                conversation_history.append(f"User: {content}")
-                conversation_history.append(f"Assistant: {response}")
+                response = chat(content, max_tokens=150)
                 
             print(f"Assistant: {response}")
             print()
@@ -203,34 +243,37 @@ def interactive_multimodal_chat():
             print()
 
 
-def content_generation_pipeline():
+def content_generation_pipeline(driver: Optional[UnifiedModelDriver] = None):
     """Generate content across multiple modalities"""
     print("=== Content Generation Pipeline ===")
     
-    driver = UnifiedModelDriver()
+    driver = driver or UnifiedModelDriver()
     
     llm = driver.load_model(LLMs.QWEN2_5_CODER_32B_INSTRUCT_BF16)
     vlm = driver.load_model(VLMs.MOLMO_7B_D_0924_BF16)
     
+    # Small model from the same family drafts tokens for speculative decoding
+    draft = driver.load_model(LLMs.QWEN2_5_CODER_0_5B_INSTRUCT_4BIT)
+
     try:
         # Step 1: Generate text content
         print("Step 1: Generating blog post content...")
         blog_prompt = "Write a blog post about the future of AI in education."
-        blog_content = llm.generate(blog_prompt, max_tokens=500)
+        blog_content = driver.speculative_generate(draft, llm, blog_prompt, max_tokens=500)
         print(f"Blog content: {blog_content[:300]}...")
         print()
         
         # Step 2: Generate image description for illustrations
         print("Step 2: Generating image suggestions...")
         image_prompt = f"Based on this blog post, suggest 3 images that would illustrate the content: {blog_content}"
-        image_suggestions = llm.generate(image_prompt, max_tokens=200)
+        image_suggestions = driver.speculative_generate(draft, llm, image_prompt, max_tokens=200)
         print(f"Image suggestions: {image_suggestions}")
         print()
         
         # Step 3: Create social media summary
         print("Step 3: Creating social media summary...")
         social_prompt = f"Create a Twitter-length summary of this blog post: {blog_content}"
-        social_summary = llm.generate(social_prompt, max_tokens=50)
+        social_summary = driver.speculative_generate(draft, llm, social_prompt, max_tokens=50)
         print(f"Social media summary: {social_summary}")
         print()
         
@@ -249,12 +292,17 @@ def main():
     print("model types for complex multimodal tasks.")
     print()
     
+    # Share one driver so repeated model loads hit the registry; models from
+    # earlier examples are unloaded once the loaded weights outgrow the GPU
+    driver = UnifiedModelDriver()
+    driver.set_memory_budget(device_memory_gb())
+
     try:
-        image_to_text_pipeline()
-        audio_to_summary_pipeline()
-        multimedia_content_analysis()
-        interactive_multimodal_chat()
-        content_generation_pipeline()
+        image_to_text_pipeline(driver)
+        audio_to_summary_pipeline(driver)
+        multimedia_content_analysis(driver)
+        interactive_multimodal_chat(driver)
+        content_generation_pipeline(driver)
         
     except Exception as e:
         print(f"Error running pipeline examples: {e}")
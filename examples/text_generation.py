@@ -3,20 +3,19 @@
 Examples for text generation using Large Language Models (LLMs)
 """
 
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from typing import Optional
 
 from src.unified_driver import UnifiedModelDriver
+from src.utils import device_memory_gb, print_stream
 from src.models import LLMs
 
 
-def basic_text_generation():
+def basic_text_generation(driver: Optional[UnifiedModelDriver] = None):
     """Basic text generation example"""
     print("=== Basic Text Generation ===")
     
     # Initialize driver
-    driver = UnifiedModelDriver()
+    driver = driver or UnifiedModelDriver()
     
     # Load a smaller model for quick testing
     model = driver.load_model(LLMs.PHI_3_5_MINI_INSTRUCT_4BIT)
@@ -30,28 +29,27 @@ def basic_text_generation():
     print()
 
 
-def streaming_generation():
+def streaming_generation(driver: Optional[UnifiedModelDriver] = None):
     """Streaming text generation example"""
     print("=== Streaming Generation ===")
     
-    driver = UnifiedModelDriver()
+    driver = driver or UnifiedModelDriver()
     model = driver.load_model(LLMs.SMOLLM_1_7B_FP16)
     
     prompt = "Write a short story about artificial intelligence in the future."
     print(f"Prompt: {prompt}")
     print("Response (streaming): ", end="")
     
-    for token in model.stream(prompt):
-        print(token, end="", flush=True)
+    print_stream(model.stream(prompt))
     
     print("\n")
 
 
-def custom_configuration():
+def custom_configuration(driver: Optional[UnifiedModelDriver] = None):
     """Using custom configuration for generation"""
     print("=== Custom Configuration ===")
     
-    driver = UnifiedModelDriver()
+    driver = driver or UnifiedModelDriver()
     
     # Custom configuration
     config = {
@@ -70,11 +68,11 @@ def custom_configuration():
     print()
 
 
-def batch_processing():
+def batch_processing(driver: Optional[UnifiedModelDriver] = None):
     """Batch processing multiple prompts"""
     print("=== Batch Processing ===")
     
-    driver = UnifiedModelDriver()
+    driver = driver or UnifiedModelDriver()
     model = driver.load_model(LLMs.MISTRAL_NEMO_INSTRUCT_2407_BF16)
     
     prompts = [
@@ -93,11 +91,11 @@ def batch_processing():
         print()
 
 
-def model_comparison():
+def model_comparison(driver: Optional[UnifiedModelDriver] = None):
     """Compare different models on the same prompt"""
     print("=== Model Comparison ===")
     
-    driver = UnifiedModelDriver()
+    driver = driver or UnifiedModelDriver()
     
     models = [
         LLMs.PHI_3_5_MINI_INSTRUCT_4BIT,
@@ -110,7 +108,8 @@ def model_comparison():
     print(f"Comparing models on prompt: {prompt}")
     print()
     
-    results = driver.compare_models(models, prompt)
+    # Quantize to 4-bit so the compared models fit in memory together
+    results = driver.compare_models(models, prompt, quantize="int4")
     
     for model_name, response in results.items():
         print(f"Model: {model_name}")
@@ -118,11 +117,11 @@ def model_comparison():
         print("-" * 50)
 
 
-def conversation_example():
+def conversation_example(driver: Optional[UnifiedModelDriver] = None):
     """Example of maintaining conversation context"""
     print("=== Conversation Example ===")
     
-    driver = UnifiedModelDriver()
+    driver = driver or UnifiedModelDriver()
     model = driver.load_model(LLMs.QWEN2_5_14B_INSTRUCT_1M_BF16)
     
     # System prompt for conversation
@@ -135,9 +134,18 @@ def conversation_example():
         "Thanks for the help!"
     ]
     
+    # Keep the KV cache across turns so each turn only prefills the new message;
+    # once the cache holds the first turn, later turns are rendered without
+    # the system prompt and BOS token
+    prompt_cache = model.make_prompt_cache()
+
     print("Conversation:")
     for i, user_input in enumerate(conversation, 1):
-        response = model.generate(user_input, system_prompt=system_prompt)
+        response = model.generate(
+            user_input,
+            system_prompt=system_prompt if i == 1 else None,
+            prompt_cache=prompt_cache
+        )
         print(f"User: {user_input}")
         print(f"Assistant: {response}")
         print()
@@ -149,13 +157,18 @@ def main():
     print("=" * 50)
     print()
     
+    # Share one driver so repeated model loads hit the registry; models from
+    # earlier examples are unloaded once the loaded weights outgrow the GPU
+    driver = UnifiedModelDriver()
+    driver.set_memory_budget(device_memory_gb())
+
     try:
-        basic_text_generation()
-        streaming_generation()
-        custom_configuration()
-        batch_processing()
-        model_comparison()
-        conversation_example()
+        basic_text_generation(driver)
+        streaming_generation(driver)
+        custom_configuration(driver)
+        batch_processing(driver)
+        model_comparison(driver)
+        conversation_example(driver)
         
     except Exception as e:
         print(f"Error running examples: {e}")
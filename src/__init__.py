@@ -9,6 +9,7 @@ using the MLX framework on Apple Silicon.
 from .unified_driver import UnifiedModelDriver
 from .models import LLMs, VLMs, ALMs
 from .config import Config
+from .worker_pool import WorkerPool
 
 __version__ = "0.1.0"
-__all__ = ["UnifiedModelDriver", "LLMs", "VLMs", "ALMs", "Config"]
\ No newline at end of file
+__all__ = ["UnifiedModelDriver", "LLMs", "VLMs", "ALMs", "Config", "WorkerPool"]
\ No newline at end of file
@@ -1,26 +1,163 @@
 import mlx.core as mx
-from typing import Dict, Any, Optional, Generator
+import numpy as np
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, Optional, Generator, Union
+from pathlib import Path
 from .base_driver import BaseModelDriver
 from .models import ALMs
-import logging
+import time
+import types
+
+
+def _fused_qkv_attention(self, q: mx.array, k: mx.array, v: mx.array, mask: Optional[mx.array] = None):
+    """Drop-in for mlx_whisper's MultiHeadAttention.qkv_attention using the fused SDPA kernel"""
+    n_batch, n_ctx, n_state = q.shape
+    head_dim = n_state // self.n_head
+    q = q.reshape(n_batch, n_ctx, self.n_head, head_dim).transpose(0, 2, 1, 3)
+    k = k.reshape(n_batch, k.shape[1], self.n_head, head_dim).transpose(0, 2, 1, 3)
+    v = v.reshape(n_batch, v.shape[1], self.n_head, head_dim).transpose(0, 2, 1, 3)
+    if mask is not None:
+        mask = mask[:n_ctx, :k.shape[2]]
+
+    out = mx.fast.scaled_dot_product_attention(q, k, v, scale=head_dim ** -0.5, mask=mask)
+    out = out.transpose(0, 2, 1, 3).reshape(n_batch, n_ctx, n_state)
+
+    # The attention weights are never materialized; encoder callers ignore them
+    return out, None
+
+
+def _trimmed_encoder_call(self, x: mx.array) -> mx.array:
+    """mlx_whisper's AudioEncoder.__call__ without the fixed 30 second input length"""
+    import mlx.nn as nn
+
+    x = nn.gelu(self.conv1(x))
+    x = nn.gelu(self.conv2(x))
+    x = x + self._positional_embedding[:x.shape[1]]
+    for block in self.blocks:
+        x, _, _ = block(x)
+    return self.ln_post(x)
+
+
+def _decode_audio(audio_file: str, sample_rate: int = 16000) -> np.ndarray:
+    """mlx_whisper's load_audio returning a numpy array, so it can run off the main thread"""
+    import subprocess
+
+    cmd = [
+        "ffmpeg", "-nostdin", "-threads", "0", "-i", audio_file,
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sample_rate), "-",
+    ]
+    try:
+        out = subprocess.run(cmd, capture_output=True, check=True).stdout
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Failed to load audio: {e.stderr.decode()}") from e
+    return np.frombuffer(out, np.int16).astype(np.float32) / 32768.0
 
 
 class ALMDriver(BaseModelDriver):
     """Driver for Audio Language Models"""
     
+    # generate() options forwarded to mlx_whisper.transcribe
+    WHISPER_KWARGS = (
+        "verbose",
+        "language",
+        "temperature",
+        "word_timestamps",
+        "initial_prompt",
+        "condition_on_previous_text",
+        "no_speech_threshold",
+    )
+
+    # transcribe() options a single unpadded decode pass cannot honour;
+    # clips given any of them go through transcribe() even when short
+    TRANSCRIBE_ONLY_KWARGS = ("condition_on_previous_text", "no_speech_threshold")
+
     def __init__(self, model_name: ALMs, config: Optional[Dict[str, Any]] = None):
         super().__init__(model_name.value, config)
-        self.model_enum = model_name
+        self.model_enum: ALMs = model_name
+        self._model_path = f"mlx-community/{self.model_name}"
         
-    def load(self, **kwargs):
-        """Load the ALM model"""
+        # Model family, resolved once from the name: "whisper", "kokoro" or "unknown"
+        name = self.model_name.lower()
+        if "whisper" in name:
+            self.backend = "whisper"
+        elif "kokoro" in name:
+            self.backend = "kokoro"
+        else:
+            self.backend = "unknown"
+        self._n_mels = None
+        self._dtype = mx.float16
+        self._base_options: dict[str, Any] = {}
+
+    def load(
+        self,
+        use_fused_sdpa: bool = True,
+        quantize_bits: Optional[int] = None,
+        warmup: bool = True,
+        **kwargs
+    ):
+        """
+        Load the ALM model
+
+        Args:
+            use_fused_sdpa: Run the Whisper encoder's self-attention through
+                mx.fast.scaled_dot_product_attention
+            quantize_bits: Quantize the encoder and decoder weights to this many
+                bits. Defaults to the ``quantize_bits`` driver config value.
+                Quantized weights are cached under cache_dir and reused on
+                the next load.
+            warmup: Run the encoder and one decoder step on silence so the
+                first transcription does not pay for kernel compilation
+            dtype: Compute dtype of the model, mx.float16 (default) or
+                mx.float32; Whisper decoding supports no other dtype
+            cache_dir: Directory holding cached quantized weights (default
+                ~/.cache/mlx_models)
+        """
         try:
-            model_path = f"mlx-community/{self.model_name}"
-            
-            if "whisper" in self.model_name.lower():
-                from mlx_whisper import load_model
-                self._model = load_model(model_path, **kwargs)
-            elif "kokoro" in self.model_name.lower():
+            if self.backend == "whisper":
+                from mlx_whisper.load_models import load_model
+                from mlx_whisper.audio import N_FFT, hanning, mel_filters
+
+                dtype = kwargs.pop("dtype", mx.float16)
+                if dtype not in (mx.float16, mx.float32):
+                    # DecodingTask only accepts fp16 or fp32 audio features,
+                    # so e.g. bfloat16 would load but fail on every decode
+                    raise ValueError(f"Whisper decoding supports float16 or float32, not {dtype}")
+                cache_dir = kwargs.pop("cache_dir", None)
+                quantize_bits = quantize_bits or self.config.get("quantize_bits")
+                quantized_path = self._quantized_path(quantize_bits, cache_dir) if quantize_bits else None
+                if quantized_path is not None and (quantized_path / "config.json").exists():
+                    self.logger.info(f"Using cached {quantize_bits}-bit weights: {quantized_path}")
+                    self._model = load_model(str(quantized_path), dtype=dtype, **kwargs)
+                    self.quant_bits = quantize_bits
+                else:
+                    self._model = load_model(self._model_path, dtype=dtype, **kwargs)
+                    if quantize_bits and quantized_path is not None:
+                        self.quantize(bits=quantize_bits)
+                        self._save_quantized(quantized_path)
+                # The encoder emits features in its positional embedding's
+                # dtype, which is what decoding checks the fp16 flag against
+                self._dtype = self._model.encoder._positional_embedding.dtype
+                self._base_options = {
+                    "verbose": True,
+                    "language": None,
+                    "temperature": 0,
+                    "word_timestamps": False,
+                    "fp16": self._dtype == mx.float16,
+                }
+
+                # Build the mel filterbank and Hann window once at load time;
+                # mlx_whisper memoizes both, so every later call reuses them
+                self._n_mels = self._model.dims.n_mels
+                mel_filters(self._n_mels)
+                hanning(N_FFT)
+
+                if use_fused_sdpa:
+                    self._use_fused_encoder_attention()
+                self._allow_short_mel()
+                if warmup:
+                    self._warmup()
+            elif self.backend == "kokoro":
                 # Placeholder for Kokoro TTS model loading
                 raise NotImplementedError("Kokoro TTS model support coming soon")
             else:
@@ -32,45 +169,476 @@ class ALMDriver(BaseModelDriver):
             self.logger.error(f"Failed to load ALM model: {e}")
             raise
             
-    def generate(self, audio_file: str = None, prompt: str = None, **kwargs) -> str:
-        """Generate transcription or audio from the model"""
+    def _warmup(self):
+        """Encode 30 seconds of silence and decode the start-of-transcript token"""
+        from mlx_whisper.audio import N_FRAMES
+        from mlx_whisper.tokenizer import get_tokenizer
+
+        start = time.perf_counter()
+        tokenizer = get_tokenizer(
+            self._model.is_multilingual, num_languages=self._model.num_languages
+        )
+        mel = mx.zeros((1, N_FRAMES, self._n_mels), dtype=self._dtype)
+        audio_features = self._model.encoder(mel)
+        logits, _, _ = self._model.decoder(mx.array([[tokenizer.sot]]), audio_features)
+        mx.eval(audio_features, logits)
+        self.logger.info(f"Warmed up {self.model_name} in {time.perf_counter() - start:.2f}s")
+
+    def _quantized_path(self, bits: int, cache_dir: Optional[str] = None) -> Path:
+        """Directory holding this model's cached quantized weights"""
+        return Path(cache_dir or "~/.cache/mlx_models").expanduser() / f"{self.model_name}-{bits}bit"
+
+    def _save_quantized(self, path: Path):
+        """Write the quantized model in the layout mlx_whisper's load_model reads"""
+        import dataclasses
+        import json
+        from mlx.utils import tree_flatten
+
+        path.mkdir(parents=True, exist_ok=True)
+        mx.save_safetensors(str(path / "weights.safetensors"), dict(tree_flatten(self._model.parameters())))
+
+        # load_model re-quantizes exactly the layers that have saved scales
+        config = dataclasses.asdict(self._model.dims)
+        config["quantization"] = {"group_size": 64, "bits": self.quant_bits}
+        with open(path / "config.json", "w", encoding="utf-8") as f:
+            json.dump(config, f, indent=2)
+        self.logger.info(f"Cached {self.quant_bits}-bit weights: {path}")
+
+    def _use_fused_encoder_attention(self):
+        """Swap the encoder's matmul + softmax attention for the fused kernel"""
+        # Only the encoder is patched: word timestamps read the decoder's
+        # cross-attention weights, which the fused kernel does not return
+        for block in self._model.encoder.blocks:
+            block.attn.qkv_attention = types.MethodType(_fused_qkv_attention, block.attn)
+
+    def _allow_short_mel(self):
+        """Let the encoder take mel inputs shorter than 30 seconds"""
+        # The stock encoder asserts a full 3000 frame input. __call__ is looked
+        # up on the type, so the encoder gets a subclass rather than a bound method
+        encoder = self._model.encoder
+        encoder.__class__ = type(
+            f"Trimmed{type(encoder).__name__}", (type(encoder),), {"__call__": _trimmed_encoder_call}
+        )
+
+    def generate(
+        self,
+        audio_file: Union[str, np.ndarray, mx.array] = None,
+        prompt: str = None,
+        trim_to_audio: bool = True,
+        **kwargs
+    ) -> str:
+        """
+        Generate transcription or audio from the model
+
+        Args:
+            audio_file: Path to an audio file, or in-memory samples as a
+                np.ndarray / mx.array. Arrays are expected to be mono float32 at
+                16 kHz; pass ``sample_rate=`` to have other rates resampled.
+            prompt: Text prompt for TTS models
+            trim_to_audio: Encode clips shorter than 30 seconds at their real
+                length instead of padding them to 30 seconds
+        """
         if not self._model:
             raise RuntimeError("Model not loaded. Call load() first.")
             
-        if "whisper" in self.model_name.lower():
-            if not audio_file:
-                raise ValueError("Audio file path required for transcription")
+        if self.backend == "whisper":
+            if audio_file is None or (isinstance(audio_file, str) and not audio_file):
+                raise ValueError("Audio file path or array required for transcription")
+            audio_file = self._prepare_audio(audio_file, kwargs.get("sample_rate"))
+            if trim_to_audio and self._decodes_in_one_pass(kwargs):
+                duration = self._audio_duration(audio_file)
+                if duration is not None and duration < 30:
+                    return self._transcribe_short(audio_file, **kwargs)
             return self._transcribe_audio(audio_file, **kwargs)
-        elif "kokoro" in self.model_name.lower():
+        elif self.backend == "kokoro":
             if not prompt:
                 raise ValueError("Text prompt required for TTS")
             return self._generate_audio(prompt, **kwargs)
+        else:
+            raise ValueError(f"Unknown ALM model type: {self.model_name}")
             
-    def stream(self, audio_file: str = None, prompt: str = None, **kwargs) -> Generator[str, None, None]:
+    def stream(
+        self,
+        audio_file: Union[str, np.ndarray, mx.array] = None,
+        prompt: str = None,
+        **kwargs
+    ) -> Generator[str, None, None]:
         """Stream transcription tokens"""
-        if "whisper" in self.model_name.lower():
+        if self.backend == "whisper":
             # Whisper doesn't support streaming by default
             result = self.generate(audio_file=audio_file, **kwargs)
             yield result
         else:
             raise NotImplementedError("Streaming not supported for this model")
             
-    def _transcribe_audio(self, audio_file: str, **kwargs) -> str:
-        """Transcribe audio using Whisper"""
-        from mlx_whisper import transcribe
+    def stream_chunked(
+        self,
+        audio_file: str,
+        chunk_s: float = 2.0,
+        left_s: float = 10.0,
+        right_s: float = 1.0,
+        **kwargs
+    ) -> Generator[str, None, None]:
+        """
+        Stream a transcription chunk by chunk without decoding the whole file
+
+        Each step transcribes a window of left context + chunk + right context
+        and only emits the words that start inside the chunk, so the first text
+        arrives after about chunk_s + right_s seconds of audio have been read.
+
+        Args:
+            audio_file: Path to an audio file readable by soundfile
+            chunk_s: Length of audio emitted per step, in seconds
+            left_s: Already transcribed audio kept as context, in seconds
+            right_s: Lookahead audio used as context, in seconds
+        """
+        if not self._model:
+            raise RuntimeError("Model not loaded. Call load() first.")
+        if self.backend != "whisper":
+            raise NotImplementedError("Chunked streaming is only supported for Whisper models")
+
+        import librosa
+        import soundfile as sf
+        from mlx_whisper.audio import SAMPLE_RATE
+
+        chunk_len = int(chunk_s * SAMPLE_RATE)
+        left_len = int(left_s * SAMPLE_RATE)
+        right_len = int(right_s * SAMPLE_RATE)
+
+        source_rate = sf.info(audio_file).samplerate
+        blocks = sf.blocks(
+            audio_file, blocksize=int(chunk_s * source_rate), dtype="float32", always_2d=True
+        )
+
+        # audio holds left context followed by samples not yet emitted;
+        # start marks where the next chunk begins inside it
+        audio = np.zeros(0, dtype=np.float32)
+        start = 0
+        exhausted = False
+
+        while not exhausted or start < len(audio):
+            if not exhausted:
+                try:
+                    block = next(blocks).mean(axis=1)
+                    if source_rate != SAMPLE_RATE:
+                        block = librosa.resample(block, orig_sr=source_rate, target_sr=SAMPLE_RATE)
+                    audio = np.concatenate([audio, block.astype(np.float32)])
+                except StopIteration:
+                    exhausted = True
+
+            # Wait for the right context unless the file has ended
+            while start < len(audio) and (exhausted or len(audio) >= start + chunk_len + right_len):
+                window_start = max(0, start - left_len)
+                window = audio[window_start:start + chunk_len + right_len]
+                text = self._transcribe_window(
+                    window, start - window_start, chunk_len, **kwargs
+                )
+                if text:
+                    yield text
+                start += chunk_len
+
+                # Drop samples that fell out of the left context
+                drop = max(0, start - left_len)
+                audio = audio[drop:]
+                start -= drop
+
+    def prefetch_audio(
+        self, audio_files: list[str], lookahead: int = 2
+    ) -> Generator[Future, None, None]:
+        """
+        Decode audio files in a background thread ahead of transcription
+
+        Yields one future per file, in order. While the caller transcribes a
+        file, up to ``lookahead`` following files are decoded to 16 kHz mono
+        float32 numpy arrays, which bounds the decoded audio held in memory.
+        The worker never touches MLX; arrays become mx.arrays on the thread
+        that transcribes them.
+        """
+        from mlx_whisper.audio import SAMPLE_RATE
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            pending: deque[Future[np.ndarray]] = deque()
+            for audio_file in audio_files:
+                pending.append(executor.submit(_decode_audio, audio_file, SAMPLE_RATE))
+                if len(pending) > lookahead:
+                    yield pending.popleft()
+            while pending:
+                yield pending.popleft()
+
+    def load_features(
+        self,
+        audio_file: str,
+        cache: bool = True,
+        regenerate: bool = False,
+        audio: Optional[np.ndarray] = None,
+    ) -> mx.array:
+        """
+        Compute log-mel features for an audio file, optionally cached on disk
+
+        Cached features are stored next to the audio file as
+        ``<audio_file>.mel_<sr>_<n_fft>_<n_mels>.npy`` and reused while they
+        are at least as new as the audio file.
         
+        Args:
+            audio_file: Path to the audio file
+            cache: Read and write the on-disk feature cache
+            regenerate: Recompute the features even if a cache file exists
+            audio: Samples already decoded from audio_file, e.g. by
+                prefetch_audio, used instead of decoding the file again
+        """
+        if not self._model:
+            raise RuntimeError("Model not loaded. Call load() first.")
+
+        from mlx_whisper.audio import log_mel_spectrogram
+
+        feat_path = self._features_path(audio_file)
+        if cache and not regenerate and self._has_cached_features(audio_file):
+            self.logger.debug(f"Using cached features: {feat_path}")
+            return mx.array(np.load(feat_path, mmap_mode="r"))
+
+        mel = log_mel_spectrogram(audio_file if audio is None else audio, n_mels=self._n_mels)
+        if cache:
+            np.save(feat_path, np.array(mel))
+            self.logger.debug(f"Cached features: {feat_path}")
+        return mel
+
+    def _features_path(self, audio_file: str) -> Path:
+        """Location of the on-disk feature cache for audio_file"""
+        from mlx_whisper.audio import N_FFT, SAMPLE_RATE
+
+        return Path(f"{audio_file}.mel_{SAMPLE_RATE}_{N_FFT}_{self._n_mels}.npy")
+
+    def _has_cached_features(self, audio_file: str) -> bool:
+        """Whether cached features exist and are at least as new as audio_file"""
+        feat_path = self._features_path(audio_file)
+        return feat_path.exists() and feat_path.stat().st_mtime >= Path(audio_file).stat().st_mtime
+
+    def transcribe_features(self, mel: mx.array, **kwargs) -> str:
+        """Transcribe precomputed log-mel features in 30 second segments"""
+        if not self._model:
+            raise RuntimeError("Model not loaded. Call load() first.")
+
+        segments = self._split_segments(mel)
+        texts = self._decode_segments(segments, kwargs.pop("batch_size", 8), **kwargs)
+        return " ".join(text for text in texts if text)
+
+    def batch_transcribe(
+        self,
+        audio_files: list[str],
+        batch_size: int = 8,
+        cache_features: bool = False,
+        regenerate: bool = False,
+        **kwargs
+    ) -> list[str]:
+        """
+        Transcribe several audio files with batched Whisper decoding
+
+        Every file is split into 30 second mel segments, and segments from all
+        files are stacked into batches of up to batch_size so the encoder and
+        decoder run once per batch instead of once per file. Files are decoded
+        on a background thread, so upcoming files decode while a full batch
+        runs through the model.
+
+        Args:
+            audio_files: Paths to the audio files
+            batch_size: Maximum number of 30 second segments per forward pass
+            cache_features: Read and write the on-disk feature cache
+            regenerate: Recompute cached features even if they exist
+
+        Returns:
+            One transcription per audio file, in input order
+        """
+        if not self._model:
+            raise RuntimeError("Model not loaded. Call load() first.")
+
+        # Only files without usable cached features need decoding
+        cached = [
+            cache_features and not regenerate and self._has_cached_features(audio_file)
+            for audio_file in audio_files
+        ]
+        decoded = self.prefetch_audio(
+            [audio_file for audio_file, hit in zip(audio_files, cached) if not hit]
+        )
+
+        texts: list[list[str]] = [[] for _ in audio_files]
+        segments: list[mx.array] = []
+        owners: list[int] = []
+
+        def decode_batch(count: int):
+            for owner, text in zip(owners[:count], self._decode_segments(segments[:count], count, **kwargs)):
+                if text:
+                    texts[owner].append(text)
+            del segments[:count], owners[:count]
+
+        try:
+            for index, (audio_file, hit) in enumerate(zip(audio_files, cached)):
+                audio = None if hit else next(decoded).result()
+                mel = self.load_features(
+                    audio_file, cache=cache_features, regenerate=regenerate, audio=audio
+                )
+                for segment in self._split_segments(mel):
+                    segments.append(segment)
+                    owners.append(index)
+                while len(segments) >= batch_size:
+                    decode_batch(batch_size)
+            if segments:
+                decode_batch(len(segments))
+        finally:
+            decoded.close()
+        return [" ".join(parts) for parts in texts]
+
+    def batch_generate(self, audio_files: list[str], **kwargs) -> list[str]:
+        """Process multiple audio files, batching Whisper transcription"""
+        if self.backend == "whisper" and len(audio_files) > 1:
+            return self.batch_transcribe(audio_files, **kwargs)
+        return [self.generate(audio_file=audio_file, **kwargs) for audio_file in audio_files]
+
+    def _prepare_input(self, item: Any, cache: dict[str, Any], **kwargs) -> Any:
+        """Decode an audio file to 16 kHz samples ahead of transcription"""
+        audio_file = item.get("audio_file") if isinstance(item, dict) else item
+        if self.backend == "whisper" and isinstance(audio_file, str):
+            # Decoded to numpy: this runs on the pipeline's producer thread
+            from mlx_whisper.audio import SAMPLE_RATE
+            return _decode_audio(audio_file, SAMPLE_RATE)
+        return audio_file
+
+    def _generate_prepared(self, prepared: Any, **kwargs) -> str:
+        """Transcribe audio returned by _prepare_input"""
+        return self.generate(audio_file=prepared, **kwargs)
+
+    def _split_segments(self, mel: mx.array) -> list[mx.array]:
+        """Split log-mel features into padded 30 second segments"""
+        from mlx_whisper.audio import N_FRAMES, pad_or_trim
+
+        return [
+            pad_or_trim(mel[seek:seek + N_FRAMES], N_FRAMES, axis=-2)
+            for seek in range(0, mel.shape[0], N_FRAMES)
+        ]
+
+    def _decode_segments(self, segments: list[mx.array], batch_size: int, **kwargs) -> list[str]:
+        """Greedy-decode mel segments in stacked batches"""
+        from mlx_whisper.decoding import DecodingOptions, decode
+
+        # transcribe() retries with each fallback temperature in turn; a single
+        # decode pass can only use the first
+        temperature = kwargs.get("temperature", 0)
+        if isinstance(temperature, (list, tuple)):
+            temperature = temperature[0]
+
+        options = DecodingOptions(
+            language=kwargs.get("language", None),
+            temperature=temperature,
+            prompt=kwargs.get("initial_prompt"),
+            without_timestamps=True,
+            fp16=self._dtype == mx.float16,
+        )
+
+        texts: list[str] = []
+        for start in range(0, len(segments), batch_size):
+            batch = mx.stack(segments[start:start + batch_size]).astype(self._dtype)
+            texts.extend(result.text.strip() for result in decode(self._model, batch, options))
+        return texts
+
+    def _transcribe_window(self, window: Any, offset: int, chunk_len: int, **kwargs) -> str:
+        """Transcribe an audio window and keep the words starting inside the chunk"""
+        from mlx_whisper.audio import SAMPLE_RATE
+
+        result = self._transcribe(
+            window,
+            **{
+                **self._base_options,
+                "language": kwargs.get("language", None),
+                "temperature": kwargs.get("temperature", 0),
+                "verbose": None,
+                "word_timestamps": True,
+            }
+        )
+
+        chunk_start = offset / SAMPLE_RATE
+        chunk_end = (offset + chunk_len) / SAMPLE_RATE
+        return "".join(
+            word["word"]
+            for segment in result["segments"]
+            for word in segment.get("words", [])
+            if chunk_start <= word["start"] < chunk_end
+        )
+
+    def _prepare_audio(
+        self, audio: Union[str, np.ndarray, mx.array], sample_rate: Optional[int] = None
+    ) -> Union[str, np.ndarray]:
+        """Pass paths through and convert in-memory audio to 16 kHz mono float32"""
+        if isinstance(audio, str):
+            return audio
+
+        from mlx_whisper.audio import SAMPLE_RATE
+
+        samples = np.asarray(audio, dtype=np.float32)
+        if samples.ndim > 1:
+            # Down-mix (samples, channels) input to mono
+            samples = samples.mean(axis=1)
+        if sample_rate is not None and sample_rate != SAMPLE_RATE:
+            import librosa
+            samples = librosa.resample(samples, orig_sr=sample_rate, target_sr=SAMPLE_RATE)
+        return samples
+
+    def _audio_duration(self, audio: Union[str, np.ndarray]) -> Optional[float]:
+        """Audio length in seconds, or None if soundfile cannot read the header"""
+        if not isinstance(audio, str):
+            from mlx_whisper.audio import SAMPLE_RATE
+            return float(len(audio) / SAMPLE_RATE)
+
+        import soundfile as sf
+
+        try:
+            info = sf.info(audio)
+        except RuntimeError:
+            # Formats soundfile cannot open still go through ffmpeg in transcribe()
+            return None
+        return float(info.frames / info.samplerate)
+
+    def _decodes_in_one_pass(self, kwargs: dict[str, Any]) -> bool:
+        """Whether the transcription options can be honoured by _transcribe_short"""
+        if kwargs.get("word_timestamps", False):
+            return False
+        if any(key in kwargs for key in self.TRANSCRIBE_ONLY_KWARGS):
+            return False
+        temperature = kwargs.get("temperature", 0)
+        return not isinstance(temperature, (list, tuple)) or len(temperature) == 1
+
+    def _transcribe_short(self, audio: Union[str, np.ndarray], **kwargs) -> str:
+        """Transcribe a clip under 30 seconds without padding its mel features"""
+        from mlx_whisper.audio import log_mel_spectrogram, pad_or_trim
+
+        mel = log_mel_spectrogram(audio, n_mels=self._n_mels)
+
+        # The encoder's stride-2 conv halves the frame count; keep it even
+        frames = max(2, mel.shape[0] + mel.shape[0] % 2)
+        mel = pad_or_trim(mel, frames, axis=-2)
+        return self._decode_segments([mel], 1, **kwargs)[0]
+
+    def _transcribe_audio(self, audio_file: Union[str, np.ndarray], **kwargs) -> str:
+        """Transcribe audio using Whisper"""
         options = {
-            "path_or_hf_repo": f"mlx-community/{self.model_name}",
-            "audio": audio_file,
-            "verbose": kwargs.get("verbose", True),
-            "language": kwargs.get("language", None),
-            "temperature": kwargs.get("temperature", 0),
-            "word_timestamps": kwargs.get("word_timestamps", False),
+            **self._base_options,
+            **{key: value for key, value in kwargs.items() if key in self.WHISPER_KWARGS},
         }
         
-        result = transcribe(**options)
-        return result["text"]
+        result = self._transcribe(audio_file, **options)
+        text: str = result["text"]
+        return text
         
+    def _transcribe(self, audio: Union[str, np.ndarray], **options) -> dict[str, Any]:
+        """Run mlx_whisper.transcribe on the model already loaded by this driver"""
+        from mlx_whisper import transcribe
+        from mlx_whisper.transcribe import ModelHolder
+
+        # transcribe() resolves weights through ModelHolder by repo path; point
+        # it at the loaded model so the call does not reload from disk
+        ModelHolder.model = self._model
+        ModelHolder.model_path = self._model_path
+        result: dict[str, Any] = transcribe(audio, path_or_hf_repo=self._model_path, **options)
+        return result
+
     def _generate_audio(self, text: str, **kwargs) -> str:
         """Generate audio using TTS model"""
         raise NotImplementedError("TTS generation coming soon")
\ No newline at end of file
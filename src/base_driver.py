@@ -1,6 +1,16 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional, Generator
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Generator, Iterable
+import asyncio
 import logging
+import queue
+import threading
+
+
+# MLX does not support evaluating graphs from several threads at once, and
+# mlx_whisper keeps its loaded model in a process global; agenerate holds
+# this lock so its worker threads never run two generations together
+_generate_lock = threading.Lock()
 
 
 class BaseModelDriver(ABC):
@@ -10,9 +20,10 @@ class BaseModelDriver(ABC):
         self.model_name = model_name
         self.config = config or {}
         self.logger = logging.getLogger(self.__class__.__name__)
-        self._model = None
-        self._tokenizer = None
-        self._processor = None
+        self._model: Any = None
+        self._tokenizer: Any = None
+        self._processor: Any = None
+        self.quant_bits: Optional[int] = None
         
     @abstractmethod
     def load(self, **kwargs):
@@ -29,21 +40,185 @@ class BaseModelDriver(ABC):
         """Stream tokens as they're generated"""
         pass
     
+    async def agenerate(self, *args, **kwargs) -> str:
+        """
+        Run generate in a worker thread without blocking the event loop
+
+        Generations started through agenerate run one at a time, process
+        wide, so awaiting several of them does not make them overlap.
+        They are not serialized against direct generate() calls made on
+        other threads.
+        """
+        return await asyncio.to_thread(self._generate_serialized, *args, **kwargs)
+
+    def _generate_serialized(self, *args, **kwargs) -> str:
+        """Call generate while holding the process-wide generation lock"""
+        with _generate_lock:
+            return self.generate(*args, **kwargs)
+
     def batch_generate(self, prompts: List[str], **kwargs) -> List[str]:
         """Process multiple prompts"""
         return [self.generate(prompt, **kwargs) for prompt in prompts]
     
+    def batch_generate_pipelined(
+        self, inputs: list[Any], prefetch: int = 4, **kwargs
+    ) -> list[str]:
+        """
+        Process multiple inputs, preparing upcoming inputs in a background thread
+
+        While the model generates for one input, up to ``prefetch`` following
+        inputs are validated and preprocessed (prompt templating, image or audio
+        decoding), so CPU-side work overlaps with inference. Results are
+        returned in input order. An input that fails to prepare or generate
+        gets an ``"Error: ..."`` entry in its place and the rest still run.
+
+        Args:
+            inputs: Prompts, or input dictionaries as used by batch_process
+            prefetch: Maximum number of prepared inputs waiting for the model
+        """
+        prepared: queue.Queue[Any] = queue.Queue(maxsize=prefetch)
+        stop = threading.Event()
+        # Scratch space shared by _prepare_input calls, e.g. decoded images
+        cache: dict[str, Any] = {}
+
+        def produce():
+            for item in inputs:
+                if stop.is_set():
+                    break
+                try:
+                    prepared.put((self._prepare_input(item, cache, **kwargs), None))
+                except Exception as e:
+                    prepared.put((None, e))
+
+        results = []
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(produce)
+            try:
+                for _ in inputs:
+                    item, error = prepared.get()
+                    try:
+                        if error is not None:
+                            raise error
+                        results.append(self._generate_prepared(item, **kwargs))
+                    except Exception as e:
+                        self.logger.error(f"Error processing input: {e}")
+                        results.append(f"Error: {str(e)}")
+            finally:
+                # Unblock a producer waiting on a full queue so the pool can exit
+                stop.set()
+                while not prepared.empty():
+                    prepared.get_nowait()
+        return results
+
+    def _prepare_input(self, item: Any, cache: dict[str, Any], **kwargs) -> Any:
+        """Preprocess one batch_generate_pipelined input off the main thread"""
+        if isinstance(item, dict):
+            item = item.get("prompt", "")
+        return self.validate_input(item)
+
+    def _generate_prepared(self, prepared: Any, **kwargs) -> str:
+        """Generate for an input returned by _prepare_input"""
+        return self.generate(prepared, **kwargs)
+
+    def _progressive_chunks(
+        self, segments: Iterable[Any], max_chunk: int = 16
+    ) -> Generator[str, None, None]:
+        """Group streamed segments into chunks of 1, 2, 4, ... up to max_chunk"""
+        chunk_size = 1
+        buffer = []
+        for segment in segments:
+            buffer.append(getattr(segment, "text", segment))
+            if len(buffer) >= chunk_size:
+                yield "".join(buffer)
+                buffer = []
+                chunk_size = min(chunk_size * 2, max_chunk)
+        if buffer:
+            yield "".join(buffer)
+
+    def _fixed_chunks(
+        self, segments: Iterable[Any], chunk_size: int = 8, max_chars: int = 64
+    ) -> Generator[str, None, None]:
+        """Group streamed segments into chunks of chunk_size, flushing early on long text or newlines"""
+        buffer = []
+        length = 0
+        for segment in segments:
+            text = getattr(segment, "text", segment)
+            buffer.append(text)
+            length += len(text)
+            if len(buffer) >= chunk_size or length >= max_chars or "\n" in text:
+                yield "".join(buffer)
+                buffer = []
+                length = 0
+        if buffer:
+            yield "".join(buffer)
+
+    @staticmethod
+    def _coerce_images(images: Any) -> list[Any]:
+        """Normalize None, a single path or a sequence of images to a list"""
+        if images is None:
+            return []
+        if isinstance(images, str):
+            return [images]
+        return list(images)
+
+    def quantize(self, bits: int = 4, group_size: int = 64):
+        """
+        Quantize the loaded model weights in place
+
+        Embedding layers and layers whose input size is not a multiple of
+        group_size are left at their original precision.
+        """
+        if not self._model:
+            raise RuntimeError("Model not loaded. Call load() first.")
+
+        self._quantize_module(self._model, bits, group_size)
+        self.quant_bits = bits
+        self.logger.info(f"Quantized {self.model_name} to {bits}-bit")
+
+    def _quantize_module(self, module: Any, bits: int, group_size: int):
+        """Quantize the eligible layers of module in place"""
+        import mlx.nn as nn
+
+        def should_quantize(path: str, layer: Any) -> bool:
+            return (
+                hasattr(layer, "to_quantized")
+                and "embed" not in path
+                and layer.weight.shape[-1] % group_size == 0
+            )
+
+        nn.quantize(module, group_size=group_size, bits=bits, class_predicate=should_quantize)
+
+    def memory_size(self) -> int:
+        """Return the size in bytes of the loaded model parameters"""
+        if not self._model:
+            return 0
+
+        from mlx.utils import tree_flatten
+        return sum(value.nbytes for _, value in tree_flatten(self._model.parameters()))
+
+    def unload(self):
+        """Release the model weights and processing components"""
+        self._model = None
+        self._tokenizer = None
+        self._processor = None
+
     def get_info(self) -> Dict[str, Any]:
         """Get model information and capabilities"""
         return {
             "model_name": self.model_name,
             "model_type": self.__class__.__name__,
             "config": self.config,
+            "quant_bits": self.quant_bits,
             "loaded": self._model is not None
         }
     
     def validate_input(self, prompt: Any) -> str:
         """Validate and convert input to string"""
+        # Fast path for the common case: the prompt is already a str
+        if type(prompt) is str:
+            if not prompt:
+                raise ValueError("Prompt cannot be empty")
+            return prompt
         if not prompt:
             raise ValueError("Prompt cannot be empty")
         return str(prompt)
\ No newline at end of file
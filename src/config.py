@@ -1,9 +1,21 @@
+import copy
 import os
 import yaml
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Optional
 from pathlib import Path
 import logging
 
+# Prefer the libyaml C bindings when PyYAML was built with them
+try:
+    from yaml import CSafeDumper as SafeDumper, CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeDumper, SafeLoader
+
+
+def _parse_bool(value: str) -> bool:
+    """Interpret an environment variable as a boolean flag"""
+    return value.lower() in ("true", "1", "yes", "on")
+
 
 class Config:
     """Configuration management for the toolkit"""
@@ -31,6 +43,17 @@ class Config:
         }
     }
     
+    # Converters for environment variable values, by config key; others stay str
+    _TYPE_CONVERTERS: dict[str, Callable[[str], Any]] = {
+        "max_tokens": int,
+        "max_concurrent": int,
+        "timeout": int,
+        "temperature": float,
+        "top_p": float,
+        "repetition_penalty": float,
+        "trust_remote_code": _parse_bool,
+    }
+
     def __init__(self, config_path: Optional[str] = None):
         """
         Initialize configuration
@@ -39,7 +62,8 @@ class Config:
             config_path: Path to config file. If None, looks for config.yaml in current dir
         """
         self.config_path = config_path or "config.yaml"
-        self.config = self.DEFAULT_CONFIG.copy()
+        # Deep copy so set() never writes into the class-level defaults
+        self.config = copy.deepcopy(self.DEFAULT_CONFIG)
         self.logger = logging.getLogger(self.__class__.__name__)
         
         # Load config from file
@@ -55,7 +79,7 @@ class Config:
         if config_file.exists():
             try:
                 with open(config_file, 'r', encoding='utf-8') as f:
-                    file_config = yaml.safe_load(f)
+                    file_config = yaml.load(f, Loader=SafeLoader)
                     
                 if file_config:
                     self._merge_config(self.config, file_config)
@@ -67,6 +91,8 @@ class Config:
         else:
             self.logger.info(f"Config file {config_file} not found, using defaults")
             
+        self._build_flat()
+
     def load_env_vars(self):
         """Load configuration from environment variables"""
         env_mappings = {
@@ -84,16 +110,12 @@ class Config:
             value = os.environ.get(env_var)
             if value is not None:
                 # Convert to appropriate type
-                if key in ["max_tokens", "max_concurrent", "timeout"]:
-                    value = int(value)
-                elif key in ["temperature", "top_p", "repetition_penalty"]:
-                    value = float(value)
-                elif key == "trust_remote_code":
-                    value = value.lower() in ("true", "1", "yes", "on")
-                    
+                value = self._TYPE_CONVERTERS.get(key, str)(value)
                 self.config[section][key] = value
                 self.logger.debug(f"Set {section}.{key} = {value} from environment")
                 
+        self._build_flat()
+
     def _merge_config(self, base: Dict[str, Any], override: Dict[str, Any]):
         """Recursively merge configuration dictionaries"""
         for key, value in override.items():
@@ -102,9 +124,18 @@ class Config:
             else:
                 base[key] = value
                 
+    def _build_flat(self):
+        """Index every value by (section, key) for single-lookup get() calls"""
+        self._flat = {
+            (section, key): value
+            for section, values in self.config.items()
+            if isinstance(values, dict)
+            for key, value in values.items()
+        }
+
     def get(self, section: str, key: str, default: Any = None) -> Any:
         """Get configuration value"""
-        return self.config.get(section, {}).get(key, default)
+        return self._flat.get((section, key), default)
         
     def get_section(self, section: str) -> Dict[str, Any]:
         """Get entire configuration section"""
@@ -115,6 +146,7 @@ class Config:
         if section not in self.config:
             self.config[section] = {}
         self.config[section][key] = value
+        self._flat[(section, key)] = value
         
     def save_config(self, path: Optional[str] = None):
         """Save current configuration to file"""
@@ -122,7 +154,7 @@ class Config:
         
         try:
             with open(output_path, 'w', encoding='utf-8') as f:
-                yaml.dump(self.config, f, default_flow_style=False, indent=2)
+                yaml.dump(self.config, f, Dumper=SafeDumper, default_flow_style=False, indent=2)
             self.logger.info(f"Configuration saved to {output_path}")
             
         except Exception as e:
@@ -165,7 +197,7 @@ class Config:
         """Create a default configuration file"""
         try:
             with open(path, 'w', encoding='utf-8') as f:
-                yaml.dump(self.DEFAULT_CONFIG, f, default_flow_style=False, indent=2)
+                yaml.dump(self.DEFAULT_CONFIG, f, Dumper=SafeDumper, default_flow_style=False, indent=2)
             self.logger.info(f"Created default config at {path}")
             
         except Exception as e:
@@ -1,59 +1,255 @@
-from mlx_lm import load, generate, stream_generate
-from typing import Dict, Any, Optional, List, Generator
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Optional, Generator
 from .base_driver import BaseModelDriver
 from .models import LLMs
-import logging
+import time
 
 
 class LLMDriver(BaseModelDriver):
     """Driver for Large Language Models"""
     
+    # Options consumed while formatting the prompt, not passed to mlx_lm
+    PROMPT_KWARGS = ("raw", "system_prompt")
+
+    # Number of rendered chat templates kept by _format_prompt
+    TEMPLATE_CACHE_SIZE = 64
+
+    # Options mlx_lm's batch_generate honours; any other option, or a
+    # repetition penalty, sends batch_generate down the serial path
+    BATCH_KWARGS = ("max_tokens", "temperature", "top_p", "repetition_penalty", "verbose") + PROMPT_KWARGS
+
     def __init__(self, model_name: LLMs, config: Optional[Dict[str, Any]] = None):
         super().__init__(model_name.value, config)
-        self.model_enum = model_name
+        self.model_enum: LLMs = model_name
+        self._token_cache: dict[str, list[int]] = {}
+        self._samplers: dict[tuple[float, float], Callable] = {}
+        self._template_cache: OrderedDict[tuple[Optional[str], str, bool, bool], Any] = OrderedDict()
+        self._build_gen_defaults()
+
+    def _build_gen_defaults(self):
+        """Merge the generation defaults with the driver config once"""
+        self._gen_defaults = {
+            "max_tokens": 500,
+            "temperature": 0.8,
+            "top_p": 0.95,
+            "repetition_penalty": 1.0,
+            **self.config,
+        }
+
+    def update_config(self, **config):
+        """Update the driver config used as defaults for every generation call"""
+        self.config.update(config)
+        self._build_gen_defaults()
+
+    def load(
+        self,
+        adapter_path: Optional[str] = None,
+        lazy: bool = True,
+        warmup: bool = True,
+        **kwargs
+    ):
+        """
+        Load the LLM model and tokenizer
+
+        Args:
+            adapter_path: Optional path to LoRA adapter weights
+            lazy: Leave weights backed by the safetensors files until first use
+                instead of reading the whole checkpoint up front
+            warmup: Run a one-token forward pass so the first generate call
+                does not pay for kernel compilation. This also reads lazily
+                loaded weights.
+        """
+        # mlx_lm is imported on first use so importing the toolkit for other
+        # model types does not pay for it
+        from mlx_lm import load
         
-    def load(self, adapter_path: Optional[str] = None, **kwargs):
-        """Load the LLM model and tokenizer"""
         try:
             model_path = f"mlx-community/{self.model_name}"
             self._model, self._tokenizer = load(
                 model_path, 
                 adapter_path=adapter_path,
+                lazy=lazy,
                 **kwargs
             )
             self.logger.info(f"Successfully loaded LLM: {self.model_name}")
+
+            if warmup:
+                self._warmup()
         except Exception as e:
             self.logger.error(f"Failed to load LLM: {e}")
             raise
             
+    def _warmup(self):
+        """Run a single-token forward pass to compile the model's kernels"""
+        import mlx.core as mx
+
+        start = time.perf_counter()
+        bos_id = self._tokenizer.bos_token_id
+        mx.eval(self._model(mx.array([[bos_id if bos_id is not None else 0]])))
+        self.logger.info(f"Warmed up {self.model_name} in {time.perf_counter() - start:.2f}s")
+
+    def make_prompt_cache(self, max_kv_size: Optional[int] = None) -> list[Any]:
+        """
+        Create a KV cache that can be passed as ``prompt_cache`` to generate/stream
+
+        The cache keeps the processed prompt and response, so follow-up calls
+        sharing it only need to prefill the new prompt.
+
+        Args:
+            max_kv_size: Keep only the most recent tokens once the cache holds
+                this many, bounding memory for long conversations
+        """
+        if not self._model:
+            raise RuntimeError("Model not loaded. Call load() first.")
+
+        from mlx_lm.models.cache import make_prompt_cache
+        cache: list[Any] = make_prompt_cache(self._model, max_kv_size=max_kv_size)
+        return cache
+
+    @staticmethod
+    def cached_tokens(prompt_cache: Optional[list[Any]]) -> int:
+        """Return the number of tokens a prompt cache has processed so far"""
+        if not prompt_cache:
+            return 0
+        # Recurrent layers keep no offset; any attention layer has the count
+        return max(getattr(layer_cache, "offset", 0) for layer_cache in prompt_cache)
+
+    def _format_prompt(self, prompt: str, **kwargs) -> Any:
+        """
+        Apply the chat template unless raw mode is requested
+
+        When ``prompt_cache`` already holds earlier turns, only the new user
+        turn and the generation prompt are rendered. The system prompt and
+        BOS token are already in the cache, so ``system_prompt`` is ignored.
+        """
+        if kwargs.get("raw", False):
+            return prompt
+
+        # Rendering the Jinja template is pure Python, so repeated prompts
+        # reuse the result from a small LRU cache
+        continuation = self.cached_tokens(kwargs.get("prompt_cache")) > 0
+        system_prompt = None if continuation else kwargs.get("system_prompt")
+        tokenize = kwargs.get("tokenize", True)
+        key = (system_prompt, prompt, tokenize, continuation)
+        if key in self._template_cache:
+            self._template_cache.move_to_end(key)
+            return self._template_cache[key]
+
+        if continuation:
+            formatted = self._format_continuation(prompt, tokenize)
+        else:
+            messages = [{"role": "user", "content": prompt}]
+            if system_prompt:
+                messages.insert(0, {"role": "system", "content": system_prompt})
+            formatted = self._tokenizer.apply_chat_template(
+                messages, add_generation_prompt=True, tokenize=tokenize
+            )
+
+        self._template_cache[key] = formatted
+        if len(self._template_cache) > self.TEMPLATE_CACHE_SIZE:
+            self._template_cache.popitem(last=False)
+        return formatted
+
+    def _format_continuation(self, prompt: str, tokenize: bool) -> Any:
+        """Render the next user turn alone, to follow the turns held in a prompt cache"""
+        # Chat templates only render whole conversations, and some always add
+        # a default system prompt. Render one around a placeholder reply and
+        # keep what follows it: the reply's end-of-turn and the new user turn
+        marker = "PREVIOUS_REPLY"
+        text = self._tokenizer.apply_chat_template(
+            [
+                {"role": "user", "content": "."},
+                {"role": "assistant", "content": marker},
+                {"role": "user", "content": prompt},
+            ],
+            add_generation_prompt=True,
+            tokenize=False,
+        )
+        text = text[text.index(marker) + len(marker):]
+
+        # mlx_lm runs the reply's final EOS token through the model before it
+        # stops, so the cache already ends with it
+        eos_token = self._tokenizer.eos_token
+        if eos_token and text.startswith(eos_token):
+            text = text[len(eos_token):]
+        return self._tokenizer.encode(text, add_special_tokens=False) if tokenize else text
+
     def generate(self, prompt: str, **kwargs) -> str:
         """Generate response for a single prompt"""
         if not self._model or not self._tokenizer:
             raise RuntimeError("Model not loaded. Call load() first.")
             
         prompt = self.validate_input(prompt)
+        prompt = self._format_prompt(prompt, **kwargs)
+        return self._generate(prompt, **kwargs)
         
-        # Apply chat template if not raw mode
-        if not kwargs.get("raw", False):
-            messages = [{"role": "user", "content": prompt}]
-            if system_prompt := kwargs.get("system_prompt"):
-                messages.insert(0, {"role": "system", "content": system_prompt})
-            prompt = self._tokenizer.apply_chat_template(
-                messages, add_generation_prompt=True
+    def generate_from_ids(self, prompt_ids: list[int], **kwargs) -> str:
+        """Generate a response for an already tokenized prompt"""
+        if not self._model or not self._tokenizer:
+            raise RuntimeError("Model not loaded. Call load() first.")
+        if not prompt_ids:
+            raise ValueError("Prompt cannot be empty")
+        return self._generate(list(prompt_ids), **kwargs)
+
+    def tokenize(self, text: str, cache: bool = False) -> list[int]:
+        """
+        Tokenize text without adding special tokens
+
+        With cache=True the ids are memoized per text, which suits static
+        prompt templates that are spliced together with dynamic content.
+        """
+        if not self._tokenizer:
+            raise RuntimeError("Model not loaded. Call load() first.")
+        if cache and text in self._token_cache:
+            return self._token_cache[text]
+        ids: list[int] = self._tokenizer.encode(text, add_special_tokens=False)
+        if cache:
+            self._token_cache[text] = ids
+        return ids
+
+    def chat_template_parts(self, system_prompt: Optional[str] = None) -> tuple[str, str]:
+        """Return the chat template text before and after the user message"""
+        if not self._tokenizer:
+            raise RuntimeError("Model not loaded. Call load() first.")
+        placeholder = "\x00"
+        text = self._format_prompt(placeholder, system_prompt=system_prompt, tokenize=False)
+        prefix, suffix = text.split(placeholder, 1)
+        return prefix, suffix
+
+    def _get_sampler(self, temperature: float, top_p: float) -> Callable:
+        """Return mlx_lm's compiled sampler, built once per setting"""
+        key = (temperature, top_p)
+        if key not in self._samplers:
+            from mlx_lm.sample_utils import make_sampler
+            self._samplers[key] = make_sampler(temp=temperature, top_p=top_p)
+        return self._samplers[key]
+
+    def _apply_sampling(self, gen_kwargs: dict[str, Any]):
+        """Replace sampling options with a sampler and logits processors"""
+        temperature = gen_kwargs.pop("temperature", 0.8)
+        top_p = gen_kwargs.pop("top_p", 0.95)
+        repetition_penalty = gen_kwargs.pop("repetition_penalty", 1.0)
+
+        gen_kwargs.setdefault("sampler", self._get_sampler(temperature, top_p))
+        if repetition_penalty != 1.0:
+            from mlx_lm.sample_utils import make_logits_processors
+            gen_kwargs.setdefault(
+                "logits_processors",
+                make_logits_processors(repetition_penalty=repetition_penalty)
             )
+
+    def _generate(self, prompt: Any, **kwargs) -> str:
+        """Run mlx_lm generation on a formatted prompt or token ids"""
+        from mlx_lm import generate
         
         # Merge config with kwargs
-        gen_kwargs = {
-            "max_tokens": 500,
-            "temperature": 0.8,
-            "top_p": 0.95,
-            "repetition_penalty": 1.0,
-        }
-        gen_kwargs.update(self.config)
-        gen_kwargs.update(kwargs)
+        gen_kwargs = self._gen_defaults | kwargs
+        for key in self.PROMPT_KWARGS:
+            gen_kwargs.pop(key, None)
+        self._apply_sampling(gen_kwargs)
         
         # Generate response
-        response = generate(
+        response: str = generate(
             self._model, 
             self._tokenizer, 
             prompt=prompt,
@@ -64,38 +260,94 @@ class LLMDriver(BaseModelDriver):
         return response
         
     def stream(self, prompt: str, **kwargs) -> Generator[str, None, None]:
-        """Stream tokens as they're generated"""
+        """
+        Stream tokens as they're generated
+
+        Tokens are yielded in chunks of up to ``chunk_size`` (default 8). With
+        ``progressive=True`` (the default) chunks grow 1, 2, 4, ... up to
+        chunk_size; otherwise each chunk holds chunk_size tokens and is flushed
+        early at a newline or 64 characters. ``chunk_size=1`` yields every token.
+        """
         if not self._model or not self._tokenizer:
             raise RuntimeError("Model not loaded. Call load() first.")
             
         prompt = self.validate_input(prompt)
+        progressive = kwargs.pop("progressive", True)
+        chunk_size = kwargs.pop("chunk_size", 8)
         
-        # Apply chat template if not raw mode
-        if not kwargs.get("raw", False):
-            messages = [{"role": "user", "content": prompt}]
-            if system_prompt := kwargs.get("system_prompt"):
-                messages.insert(0, {"role": "system", "content": system_prompt})
-            prompt = self._tokenizer.apply_chat_template(
-                messages, add_generation_prompt=True
-            )
+        prompt = self._format_prompt(prompt, **kwargs)
         
         # Merge config with kwargs
-        gen_kwargs = {
-            "max_tokens": 500,
-            "temperature": 0.8,
-            "top_p": 0.95,
-        }
-        gen_kwargs.update(self.config)
-        gen_kwargs.update(kwargs)
+        gen_kwargs = self._gen_defaults | kwargs
+        for key in self.PROMPT_KWARGS:
+            gen_kwargs.pop(key, None)
+        self._apply_sampling(gen_kwargs)
         
         # Stream generate
-        for token in stream_generate(
+        from mlx_lm import stream_generate
+        segments = stream_generate(
             self._model,
             self._tokenizer,
             prompt=prompt,
             **gen_kwargs
+        )
+
+        # Progressive mode emits the first token immediately and then
+        # doubles the chunk size to keep time-to-first-token low
+        if progressive:
+            yield from self._progressive_chunks(segments, max_chunk=chunk_size)
+        else:
+            yield from self._fixed_chunks(segments, chunk_size=chunk_size)
+
+    def batch_generate(self, prompts: list[str], **kwargs) -> list[str]:
+        """
+        Generate responses for several prompts in one padded batch
+
+        Options the batched sampler cannot apply, such as repetition_penalty
+        or logits processors, fall back to generating the prompts one by one
+        so the output matches generate().
+        """
+        if not self._model or not self._tokenizer:
+            raise RuntimeError("Model not loaded. Call load() first.")
+
+        gen_kwargs = self._gen_defaults | kwargs
+        if gen_kwargs["repetition_penalty"] != 1.0 or any(
+            key not in self.BATCH_KWARGS for key in gen_kwargs
         ):
-            yield token
+            return super().batch_generate(prompts, **kwargs)
+
+        try:
+            from mlx_lm import batch_generate
+        except ImportError:
+            # Older mlx_lm releases have no batched generation
+            return super().batch_generate(prompts, **kwargs)
+
+        prompt_tokens = []
+        for prompt in prompts:
+            prompt = self._format_prompt(self.validate_input(prompt), **kwargs)
+            if isinstance(prompt, str):
+                prompt = self._tokenizer.encode(prompt)
+            prompt_tokens.append(prompt)
+
+        response = batch_generate(
+            self._model,
+            self._tokenizer,
+            prompt_tokens,
+            max_tokens=gen_kwargs["max_tokens"],
+            sampler=self._get_sampler(gen_kwargs["temperature"], gen_kwargs["top_p"]),
+        )
+        texts: list[str] = response.texts
+        return texts
+
+    def _prepare_input(self, item: Any, cache: dict[str, Any], **kwargs) -> Any:
+        """Validate and template a prompt ahead of generation"""
+        if isinstance(item, dict):
+            item = item.get("prompt", "")
+        return self._format_prompt(self.validate_input(item), **kwargs)
+
+    def _generate_prepared(self, prepared: Any, **kwargs) -> str:
+        """Generate from a prompt that _prepare_input already templated"""
+        return self._generate(prepared, **kwargs)
 
 
 def main():
@@ -17,6 +17,7 @@ class LLMs(Enum):
     QWEN2_5_32B_INSTRUCT_BF16 = "Qwen2.5-32B-Instruct-bf16"
     MIXTRAL_8X22B_INSTRUCT_V0_1_8BIT = "Mixtral-8x22B-Instruct-v0.1-8bit"
     QWEN2_5_CODER_32B_INSTRUCT_BF16 = "Qwen2.5-Coder-32B-Instruct-bf16"
+    QWEN2_5_CODER_0_5B_INSTRUCT_4BIT = "Qwen2.5-Coder-0.5B-Instruct-4bit"
     OLMOE_1B_7B_0125_INSTRUCT = "OLMoE-1B-7B-0125-Instruct"
     MAMBA_CODESTRAL_7B_V0_1 = "Mamba-Codestral-7B-v0.1"
 
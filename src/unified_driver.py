@@ -1,18 +1,23 @@
-from typing import Union, Optional, Dict, Any, List
+from typing import TYPE_CHECKING, Union, Optional, Dict, Any, KeysView, List
+from collections import OrderedDict
 from pathlib import Path
 import logging
 import os
 
 from .models import LLMs, VLMs, ALMs
 from .llm_driver import LLMDriver
-from .vlm_driver import VLMDriver
 from .alm_driver import ALMDriver
 from .base_driver import BaseModelDriver
 
+if TYPE_CHECKING:
+    from .worker_pool import WorkerPool
+
 
 class UnifiedModelDriver:
     """Unified interface for all model types"""
     
+    QUANTIZE_BITS = {"int4": 4, "int8": 8}
+
     def __init__(self, cache_dir: Optional[str] = None, log_level: str = "INFO"):
         """
         Initialize the unified driver
@@ -31,14 +36,18 @@ class UnifiedModelDriver:
         )
         self.logger = logging.getLogger(self.__class__.__name__)
         
-        # Model registry
-        self._models: Dict[str, BaseModelDriver] = {}
+        # Model registry, ordered from least to most recently used
+        self._models: OrderedDict[str, BaseModelDriver] = OrderedDict()
+        self._model_sizes: dict[str, int] = {}
+        self._load_kwargs: dict[str, dict[str, Any]] = {}
+        self._memory_budget: Optional[int] = None
         self._active_model: Optional[BaseModelDriver] = None
         
     def load_model(
         self, 
         model_enum: Union[LLMs, VLMs, ALMs],
         config: Optional[Dict[str, Any]] = None,
+        quantize: Optional[str] = None,
         **kwargs
     ) -> BaseModelDriver:
         """
@@ -47,15 +56,40 @@ class UnifiedModelDriver:
         Args:
             model_enum: Model enum from LLMs, VLMs, or ALMs
             config: Model configuration
+            quantize: Quantize weights after loading ("int4" or "int8")
             **kwargs: Additional arguments for model loading
             
         Returns:
             Loaded model driver
         """
+        quant_bits = None
+        if quantize is not None:
+            if quantize not in self.QUANTIZE_BITS:
+                raise ValueError(f"Unknown quantization: {quantize}")
+            quant_bits = self.QUANTIZE_BITS[quantize]
+
+        # Reuse an already loaded driver when the configuration and load
+        # arguments match; otherwise replace it
+        model_key = model_enum.value
+        cached = self._models.get(model_key)
+        if cached is not None:
+            if (
+                cached.config == (config or {})
+                and cached.quant_bits == quant_bits
+                and self._load_kwargs.get(model_key) == kwargs
+            ):
+                self.logger.debug(f"Reusing loaded model: {model_key}")
+                self._models.move_to_end(model_key)
+                self._active_model = cached
+                return cached
+            self.unload_model(model_key)
+
         # Determine model type and create appropriate driver
         if isinstance(model_enum, LLMs):
-            driver = LLMDriver(model_enum, config)
+            driver: BaseModelDriver = LLMDriver(model_enum, config)
         elif isinstance(model_enum, VLMs):
+            # mlx_vlm is only imported once a VLM is requested
+            from .vlm_driver import VLMDriver
             driver = VLMDriver(model_enum, config)
         elif isinstance(model_enum, ALMs):
             driver = ALMDriver(model_enum, config)
@@ -65,12 +99,22 @@ class UnifiedModelDriver:
         # Load the model
         try:
             self.logger.info(f"Loading model: {model_enum.value}")
-            driver.load(**kwargs)
+            load_kwargs = dict(kwargs)
+            if isinstance(model_enum, (VLMs, ALMs)):
+                # Local model copies and quantized Whisper weights live under
+                # this driver's cache_dir
+                load_kwargs.setdefault("cache_dir", self.cache_dir)
+            driver.load(**load_kwargs)
+            if quant_bits is not None and driver.quant_bits is None:
+                driver.quantize(bits=quant_bits)
             
             # Store in registry
-            model_key = model_enum.value
             self._models[model_key] = driver
+            self._models.move_to_end(model_key)
+            self._model_sizes[model_key] = driver.memory_size()
+            self._load_kwargs[model_key] = dict(kwargs)
             self._active_model = driver
+            self._enforce_memory_budget(keep=model_key)
             
             self.logger.info(f"Successfully loaded: {model_enum.value}")
             return driver
@@ -81,21 +125,58 @@ class UnifiedModelDriver:
             
     def get_model(self, model_name: str) -> Optional[BaseModelDriver]:
         """Get a loaded model by name"""
+        if model_name in self._models:
+            self._models.move_to_end(model_name)
         return self._models.get(model_name)
         
-    def list_loaded_models(self) -> List[str]:
-        """List all loaded models"""
-        return list(self._models.keys())
+    def set_memory_budget(self, gb: Optional[float]):
+        """
+        Limit the combined weight size of loaded models
+
+        When a load exceeds the budget, the least recently used models are
+        unloaded until the rest fit. Pass None to remove the limit.
+        """
+        self._memory_budget = None if gb is None else int(gb * 1024 ** 3)
+        self._enforce_memory_budget()
+
+    def _enforce_memory_budget(self, keep: Optional[str] = None):
+        """Unload least recently used models until the budget is met"""
+        if self._memory_budget is None:
+            return
+
+        total = sum(self._model_sizes.values())
+        for model_name in list(self._models):
+            if total <= self._memory_budget:
+                break
+            if model_name == keep:
+                continue
+            total -= self._model_sizes.get(model_name, 0)
+            self.logger.info(f"Memory budget exceeded, evicting: {model_name}")
+            self.unload_model(model_name)
+
+    def list_loaded_models(self) -> KeysView[str]:
+        """
+        List all loaded models
+
+        Returns a live view in least to most recently used order; wrap it in
+        list() to keep a snapshot across loads and unloads.
+        """
+        return self._models.keys()
         
     def unload_model(self, model_name: str) -> bool:
         """Unload a model from memory"""
-        if model_name in self._models:
-            del self._models[model_name]
-            if self._active_model and self._active_model.model_name == model_name:
-                self._active_model = None
-            self.logger.info(f"Unloaded model: {model_name}")
-            return True
-        return False
+        try:
+            driver = self._models.pop(model_name)
+        except KeyError:
+            return False
+
+        driver.unload()
+        self._model_sizes.pop(model_name, None)
+        self._load_kwargs.pop(model_name, None)
+        if self._active_model is driver:
+            self._active_model = None
+        self.logger.info(f"Unloaded model: {model_name}")
+        return True
         
     def get_active_model(self) -> Optional[BaseModelDriver]:
         """Get the currently active model"""
@@ -103,15 +184,18 @@ class UnifiedModelDriver:
         
     def set_active_model(self, model_name: str) -> bool:
         """Set the active model"""
-        if model_name in self._models:
-            self._active_model = self._models[model_name]
-            return True
-        return False
+        try:
+            self._models.move_to_end(model_name)
+        except KeyError:
+            return False
+        self._active_model = self._models[model_name]
+        return True
         
     def compare_models(
         self, 
         models: List[Union[LLMs, VLMs, ALMs]], 
         prompt: str,
+        quantize: Optional[str] = None,
         **kwargs
     ) -> Dict[str, str]:
         """
@@ -120,46 +204,114 @@ class UnifiedModelDriver:
         Args:
             models: List of model enums to compare
             prompt: Input prompt
+            quantize: Quantization applied to models loaded for the comparison
             **kwargs: Additional generation arguments
             
         Returns:
             Dictionary mapping model names to their outputs
         """
-        results = {}
-        
-        for model_enum in models:
-            try:
-                # Load model if not already loaded
-                model_name = model_enum.value
-                if model_name not in self._models:
-                    self.load_model(model_enum)
-                    
-                driver = self._models[model_name]
-                
-                # Generate response based on model type
-                if isinstance(driver, VLMDriver):
-                    response = driver.generate(prompt, images=kwargs.get("images"), **kwargs)
-                elif isinstance(driver, ALMDriver):
-                    response = driver.generate(
-                        audio_file=kwargs.get("audio_file"),
-                        prompt=prompt if "kokoro" in model_name.lower() else None,
-                        **kwargs
-                    )
-                else:
-                    response = driver.generate(prompt, **kwargs)
-                    
-                results[model_name] = response
-                
-            except Exception as e:
-                self.logger.error(f"Error with model {model_name}: {e}")
-                results[model_name] = f"Error: {str(e)}"
+        # Models run one after another. mlx_lm and mlx_vlm generate on their
+        # own stream whatever the caller sets, and MLX does not support
+        # evaluating from several threads at once
+        return {
+            model_enum.value: self._compare_one(model_enum, prompt, quantize, **kwargs)
+            for model_enum in models
+        }
+
+    def _compare_one(
+        self,
+        model_enum: Union[LLMs, VLMs, ALMs],
+        prompt: str,
+        quantize: Optional[str] = None,
+        **kwargs
+    ) -> str:
+        """Load a model if needed and generate its comparison response"""
+        model_name = model_enum.value
+        try:
+            # Load model if not already loaded, or reload it when it was
+            # loaded with a different quantization than requested
+            if quantize is not None and quantize not in self.QUANTIZE_BITS:
+                raise ValueError(f"Unknown quantization: {quantize}")
+            quant_bits = self.QUANTIZE_BITS[quantize] if quantize is not None else None
+            driver = self._models.get(model_name)
+            if driver is None or driver.quant_bits != quant_bits:
+                driver = self.load_model(model_enum, quantize=quantize)
+
+            return self._generate_for(model_enum, driver, prompt, **kwargs)
                 
-        return results
+        except Exception as e:
+            self.logger.error(f"Error with model {model_name}: {e}")
+            return f"Error: {str(e)}"
+
+    def _generate_for(
+        self,
+        model_enum: Union[LLMs, VLMs, ALMs],
+        driver: BaseModelDriver,
+        prompt: str,
+        **kwargs
+    ) -> str:
+        """Generate a response based on model type"""
+        images = kwargs.pop("images", None)
+        audio_file = kwargs.pop("audio_file", None)
+
+        if isinstance(model_enum, VLMs):
+            return driver.generate(prompt, images=images, **kwargs)
+        elif isinstance(driver, ALMDriver):
+            return driver.generate(
+                audio_file=audio_file,
+                prompt=prompt if driver.backend == "kokoro" else None,
+                **kwargs
+            )
+        return driver.generate(prompt, **kwargs)
+
+    def speculative_generate(
+        self,
+        draft_model: LLMDriver,
+        target_model: LLMDriver,
+        prompt: str,
+        k: int = 4,
+        **kwargs
+    ) -> str:
+        """
+        Generate with speculative decoding
+
+        The draft model proposes k tokens per step and the target model
+        verifies them in a single forward pass, so the output follows the
+        target model's distribution at a higher token rate.
+
+        Args:
+            draft_model: Small loaded LLM sharing the target's tokenizer
+            target_model: Loaded LLM whose output is returned
+            prompt: Input prompt
+            k: Number of draft tokens proposed per step
+            **kwargs: Additional generation arguments
+
+        Returns:
+            Generated text
+        """
+        if not isinstance(draft_model, LLMDriver) or not isinstance(target_model, LLMDriver):
+            raise ValueError("Speculative decoding requires LLM drivers")
+        if draft_model._tokenizer.vocab_size != target_model._tokenizer.vocab_size:
+            raise ValueError(
+                f"Draft model {draft_model.model_name} does not share a vocabulary "
+                f"with {target_model.model_name}"
+            )
+
+        return target_model.generate(
+            prompt,
+            draft_model=draft_model._model,
+            num_draft_tokens=k,
+            **kwargs
+        )
         
     def batch_process(
         self,
         inputs: List[Dict[str, Any]],
         model_enum: Union[LLMs, VLMs, ALMs],
+        cache_features: bool = False,
+        cache_regenerate: bool = False,
+        max_batch_size: int = 8,
+        pool: Optional["WorkerPool"] = None,
         **kwargs
     ) -> List[str]:
         """
@@ -168,33 +320,102 @@ class UnifiedModelDriver:
         Args:
             inputs: List of input dictionaries with 'prompt' and optional 'images'/'audio_file'
             model_enum: Model to use
+            cache_features: Store audio features next to each file and reuse them on later runs
+            cache_regenerate: Recompute cached audio features even if they exist
+            max_batch_size: Maximum prompts (LLMs) or 30 s audio segments (Whisper)
+                per batched forward pass
+            pool: Worker pool with warm drivers to run the inputs on
             **kwargs: Additional generation arguments
             
         Returns:
             List of responses
         """
+        if pool is not None:
+            return pool.batch_process(
+                inputs,
+                model_enum,
+                cache_features=cache_features,
+                cache_regenerate=cache_regenerate,
+                max_batch_size=max_batch_size,
+                **kwargs
+            )
+
         # Load model if needed
-        model_name = model_enum.value
-        if model_name not in self._models:
-            self.load_model(model_enum)
-            
-        driver = self._models[model_name]
-        results = []
+        driver = self.get_model(model_enum.value)
+        if driver is None:
+            driver = self.load_model(model_enum)
+        results: List[str] = []
         
+        # LLM prompts are grouped into padded batches of up to max_batch_size
+        if isinstance(driver, LLMDriver):
+            for start in range(0, len(inputs), max_batch_size):
+                group = inputs[start:start + max_batch_size]
+                try:
+                    results.extend(driver.batch_generate(
+                        [input_data.get("prompt", "") for input_data in group],
+                        **kwargs
+                    ))
+                except Exception as e:
+                    # Retry the group prompt by prompt so one bad input does
+                    # not turn the whole group into errors
+                    self.logger.warning(f"Batch failed, processing prompts one by one: {e}")
+                    for input_data in group:
+                        try:
+                            results.append(driver.generate(input_data.get("prompt", ""), **kwargs))
+                        except Exception as prompt_error:
+                            self.logger.error(f"Error processing input: {prompt_error}")
+                            results.append(f"Error: {str(prompt_error)}")
+            return results
+
+        # Whisper inputs are transcribed in stacked batches; missing files get
+        # per-input errors up front instead of failing the whole batch
+        if isinstance(driver, ALMDriver) and driver.backend == "whisper":
+            audio_files = [input_data.get("audio_file") for input_data in inputs]
+            found = [
+                (index, audio_file) for index, audio_file in enumerate(audio_files)
+                if isinstance(audio_file, str) and os.path.isfile(audio_file)
+            ]
+            results = [f"Error: Audio file not found: {audio_file}" for audio_file in audio_files]
+            if not found:
+                return results
+            try:
+                texts = driver.batch_transcribe(
+                    [audio_file for _, audio_file in found],
+                    batch_size=max_batch_size,
+                    cache_features=cache_features,
+                    regenerate=cache_regenerate,
+                    **kwargs
+                )
+            except Exception as e:
+                # One bad file fails the whole batch; transcribe each file on
+                # its own so every input reports its own result or error
+                self.logger.warning(f"Batched transcription failed, processing files one by one: {e}")
+                texts = []
+                for _, audio_file in found:
+                    try:
+                        texts.append(driver.generate(audio_file=audio_file, **kwargs))
+                    except Exception as file_error:
+                        self.logger.error(f"Error processing input: {file_error}")
+                        texts.append(f"Error: {str(file_error)}")
+            for (index, _), text in zip(found, texts):
+                results[index] = text
+            return results
+
+        # Images are decoded in the background while the previous input is
+        # generated; failed inputs get their own error entries
+        if isinstance(model_enum, VLMs):
+            from .vlm_driver import VLMDriver
+            if isinstance(driver, VLMDriver):
+                return driver.batch_generate_pipelined(inputs, **kwargs)
+
         for input_data in inputs:
             try:
                 prompt = input_data.get("prompt", "")
                 
-                if isinstance(driver, VLMDriver):
-                    response = driver.generate(
-                        prompt, 
-                        images=input_data.get("images"),
-                        **kwargs
-                    )
-                elif isinstance(driver, ALMDriver):
+                if isinstance(driver, ALMDriver):
                     response = driver.generate(
                         audio_file=input_data.get("audio_file"),
-                        prompt=prompt if "kokoro" in model_name.lower() else None,
+                        prompt=prompt if driver.backend == "kokoro" else None,
                         **kwargs
                     )
                 else:
@@ -0,0 +1,58 @@
+import sys
+import time
+from typing import Iterable, Optional, TextIO
+
+
+def print_stream(
+    tokens: Iterable[str],
+    flush_interval: float = 0.02,
+    flush_tokens: int = 16,
+    file: Optional[TextIO] = None
+) -> str:
+    """
+    Write streamed tokens to a text stream in buffered chunks
+
+    Tokens are flushed every flush_interval seconds or every flush_tokens
+    tokens, whichever comes first, instead of one write and flush per token.
+
+    Args:
+        tokens: Iterable of streamed text segments
+        flush_interval: Maximum time in seconds a token stays buffered
+        flush_tokens: Maximum number of buffered tokens
+        file: Output stream (default: sys.stdout)
+
+    Returns:
+        The full streamed text
+    """
+    out = file or sys.stdout
+    buffer = []
+    written = []
+    last_flush = time.monotonic()
+
+    for token in tokens:
+        buffer.append(getattr(token, "text", token))
+        now = time.monotonic()
+        if len(buffer) >= flush_tokens or now - last_flush >= flush_interval:
+            chunk = "".join(buffer)
+            out.write(chunk)
+            out.flush()
+            written.append(chunk)
+            buffer = []
+            last_flush = now
+
+    if buffer:
+        chunk = "".join(buffer)
+        out.write(chunk)
+        written.append(chunk)
+    out.flush()
+
+    return "".join(written)
+
+
+def device_memory_gb() -> float:
+    """Return the GPU working set size MLX recommends for this machine, in GB"""
+    import mlx.core as mx
+
+    # mx.device_info replaced mx.metal.device_info in newer MLX releases
+    device_info = getattr(mx, "device_info", None) or mx.metal.device_info
+    return float(device_info()["max_recommended_working_set_size"] / 1024 ** 3)
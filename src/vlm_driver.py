@@ -1,87 +1,363 @@
+import mlx.core as mx
 from mlx_vlm.prompt_utils import apply_chat_template
 from mlx_vlm.utils import (
     load,
     load_config,
+    load_image,
     generate,
+    get_model_path,
     stream_generate,
 )
-from typing import Dict, Any, Optional, List, Union, Generator
+from collections import OrderedDict
+from weakref import WeakValueDictionary
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, Any, Iterable, Optional, List, Union, Generator
 from .base_driver import BaseModelDriver
 from .models import VLMs
-import logging
+import hashlib
+import mmap
+import os
+import queue
+import threading
+import time
 from pathlib import Path
 
 
+# Shared pool for checking many image paths at once, created on first use
+_stat_pool: Optional[ThreadPoolExecutor] = None
+
+
+def _get_stat_pool() -> ThreadPoolExecutor:
+    global _stat_pool
+    if _stat_pool is None:
+        _stat_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="vlm-stat")
+    return _stat_pool
+
+
+def _not_loaded(*args: Any, **kwargs: Any) -> Any:
+    """Stand-in for the bound generate/stream/template functions before load()"""
+    raise RuntimeError("Model not loaded. Call load() first.")
+
+
+class _LoadedVLM:
+    """Model, processor and config loaded once and shared between VLMDriver instances"""
+
+    def __init__(self, model: Any, processor: Any, config: dict[str, Any]):
+        self.model = model
+        self.processor = processor
+        self.config = config
+        self.quant_bits: Optional[int] = None
+
+
+def _qwen2_vl_template(prompt: str, num_images: int) -> str:
+    return (
+        "<|im_start|>system\nYou are a helpful assistant.<|im_end|>\n<|im_start|>user\n"
+        + "<|vision_start|><|image_pad|><|vision_end|>" * num_images
+        + f"{prompt}<|im_end|>\n<|im_start|>assistant\n"
+    )
+
+
+def _smolvlm_template(prompt: str, num_images: int) -> str:
+    return f"<|im_start|>User:{'<image>' * num_images}{prompt}<end_of_utterance>\nAssistant:"
+
+
 class VLMDriver(BaseModelDriver):
     """Driver for Vision Language Models"""
     
+    # Options consumed while formatting the prompt, not passed to mlx_vlm
+    PROMPT_KWARGS = ("system_prompt",)
+
+    # Number of rendered chat templates kept by _format_prompt
+    TEMPLATE_CACHE_SIZE = 128
+
+    # Plain string versions of single user turn chat templates. Each is
+    # checked against apply_chat_template once per image count before use
+    _FAST_TEMPLATES: dict[VLMs, Callable[[str, int], str]] = {
+        VLMs.QWEN2_5_VL_32B_INSTRUCT_BF16: _qwen2_vl_template,
+        VLMs.OLMOCR_7B_0225_PREVIWE_BF16: _qwen2_vl_template,
+        VLMs.SMOLVLM_INSTRUCT_BF16: _smolvlm_template,
+    }
+
+    # Loaded models by (model path, adapter path, dtype, encoder_quant).
+    # Entries live while any driver still holds them, so instances loading
+    # the same model share one copy of the weights
+    _model_registry: "WeakValueDictionary[tuple[Any, ...], _LoadedVLM]" = WeakValueDictionary()
+
     def __init__(self, model_name: VLMs, config: Optional[Dict[str, Any]] = None):
         super().__init__(model_name.value, config)
-        self.model_enum = model_name
-        self._config = None
+        self.model_enum: VLMs = model_name
+        self._config: Optional[dict[str, Any]] = None
+        self._loaded: Optional[_LoadedVLM] = None
+        self._template_cache: OrderedDict[tuple[Optional[str], str, int], str] = OrderedDict()
+        self._prompt_cache: Optional[list[Any]] = None
+        self._cache_key: Optional[tuple[Any, ...]] = None
+        self._img_pool: Optional[ThreadPoolExecutor] = None
+        self._generate_fn: Callable[..., str] = _not_loaded
+        self._stream_fn: Callable[..., Any] = _not_loaded
+        self._template_fn: Callable[..., str] = _not_loaded
+        self._kv_bits: Optional[int] = None
+        self._kv_quant_start = 0
+        self._fast_template_ok: dict[int, bool] = {}
+        self._build_gen_defaults()
         
-    def load(self, adapter_path: Optional[str] = None, **kwargs):
-        """Load the VLM model and processor"""
+    def _build_gen_defaults(self):
+        """Merge the generation defaults with the driver config once"""
+        self._gen_defaults = {
+            "max_tokens": 500,
+            "temperature": 0.8,
+            "top_p": 0.95,
+            **self.config,
+        }
+
+    def update_config(self, **config):
+        """Update the driver config used as defaults for every generation call"""
+        self.config.update(config)
+        self._build_gen_defaults()
+
+    # Bits for the encoder_quant and kv_quant options of load()
+    QUANT_BITS = {"int4": 4, "int8": 8}
+
+    def load(
+        self,
+        adapter_path: Optional[str] = None,
+        dtype: Optional[str] = "bfloat16",
+        encoder_quant: Optional[str] = None,
+        warmup: bool = True,
+        **kwargs
+    ):
+        """
+        Load the VLM model and processor
+
+        Drivers that load the same model with the same options share
+        the weights of the first one. In-place changes such as quantize()
+        therefore apply to every driver sharing them.
+
+        Args:
+            adapter_path: Optional path to LoRA adapter weights
+            dtype: Cast floating point weights to this mlx dtype. Activations
+                and the KV cache follow the weight dtype, so bfloat16 halves
+                their memory traffic for float32 checkpoints. None keeps the
+                checkpoint dtype.
+            encoder_quant: Quantize the vision tower weights ("int8" or
+                "int4") after loading; the language model keeps the
+                checkpoint's quantization
+            warmup: Generate one token from a short text prompt so the first
+                generate call does not pay for kernel compilation. This also
+                reads the language model's lazily loaded weights.
+            lazy: Leave weights memory-mapped until first use (default True);
+                only the embeddings are read at load time
+            kv_quant: Store the KV cache quantized ("int8" or "int4") during
+                generation. Keys and values are quantized in groups of 64 and
+                dequantized inside quantized attention. Not combined with
+                kv_window, whose rotating cache cannot be quantized.
+            kv_quant_start: Number of cached tokens kept in full precision
+                before kv_quant takes effect (default 0, so the cache is
+                quantized from the first step)
+            cache_dir: Directory checked for a local copy of the model before
+                the Hub repo is used (default ~/.cache/mlx_models)
+        """
         try:
-            model_path = f"mlx-community/{self.model_name}"
+            self._load_impl(adapter_path, dtype, encoder_quant, warmup, **kwargs)
+        except Exception as e:
+            self.logger.error(f"Failed to load VLM: {e}")
+            raise
+
+    def load_fast(
+        self,
+        adapter_path: Optional[str] = None,
+        dtype: Optional[str] = "bfloat16",
+        encoder_quant: Optional[str] = None,
+        warmup: bool = True,
+        **kwargs
+    ):
+        """Load like load(), without the error logging wrapper, for tight model-swapping loops"""
+        self._load_impl(adapter_path, dtype, encoder_quant, warmup, **kwargs)
+
+    def _load_impl(
+        self,
+        adapter_path: Optional[str],
+        dtype: Optional[str],
+        encoder_quant: Optional[str],
+        warmup: bool,
+        **kwargs
+    ):
+        """Load the model and processor; see load() for the arguments"""
+        if encoder_quant is not None and encoder_quant not in self.QUANT_BITS:
+            raise ValueError(f"Unknown encoder quantization: {encoder_quant}")
+        kv_quant = kwargs.get("kv_quant")
+        if kv_quant is not None and kv_quant not in self.QUANT_BITS:
+            raise ValueError(f"Unknown KV cache quantization: {kv_quant}")
+        self._kv_bits = None if kv_quant is None else self.QUANT_BITS[kv_quant]
+        self._kv_quant_start = kwargs.get("kv_quant_start", 0)
+
+        lazy = kwargs.get("lazy", True)
+        # Resolve the Hub repo to its local snapshot once, so load_config
+        # and load below both read local files instead of each querying the Hub
+        model_path = str(get_model_path(self._resolve_model_path(kwargs.get("cache_dir"))))
+        key = (model_path, adapter_path, dtype, encoder_quant)
+        loaded = self._model_registry.get(key)
+        if loaded is not None:
+            self.logger.info(f"Sharing already loaded VLM: {self.model_name}")
+            self._model, self._processor, self._config = loaded.model, loaded.processor, loaded.config
+            self.quant_bits = loaded.quant_bits
+            self._bind_model()
+        else:
+            # With lazy loading, weights are read on first use; ask the kernel
+            # to read the weight files ahead so that use hits the page cache.
+            # The hints return immediately and the reads happen asynchronously
+            if lazy:
+                self._prefetch_weights(model_path)
+
             self._config = load_config(model_path, trust_remote_code=True)
             self._model, self._processor = load(
                 model_path, 
                 adapter_path=adapter_path, 
-                lazy=kwargs.get("lazy", False), 
+                lazy=lazy, 
                 trust_remote_code=True
             )
-            self.logger.info(f"Successfully loaded VLM: {self.model_name}")
-        except Exception as e:
-            self.logger.error(f"Failed to load VLM: {e}")
-            raise
+            if dtype is not None:
+                self._cast_weights(getattr(mx, dtype))
+            if encoder_quant is not None:
+                self._quantize_vision_tower(self.QUANT_BITS[encoder_quant])
+            if lazy:
+                self._eval_embeddings()
+            loaded = _LoadedVLM(self._model, self._processor, self._config)
+            self._model_registry[key] = loaded
+            self._bind_model()
+            if warmup:
+                self._warmup()
             
-    def generate(self, prompt: str, images: Optional[Union[str, List[str]]] = None, **kwargs) -> str:
-        """Generate response for prompt with optional images"""
-        if not self._model or not self._processor:
-            raise RuntimeError("Model not loaded. Call load() first.")
+        # Holding the entry keeps it in the registry while this driver is loaded
+        self._loaded = loaded
+        self.reset_cache()
+        self.logger.info(f"Successfully loaded VLM: {self.model_name}")
+
+    def _bind_model(self):
+        """Bind the loaded model, processor and config into the mlx_vlm call paths"""
+        self._generate_fn = partial(generate, self._model, self._processor)
+        self._stream_fn = partial(stream_generate, self._model, self._processor)
+        self._template_fn = partial(apply_chat_template, self._processor, self._config)
+
+    def _prefetch_weights(self, model_path: str):
+        """Hint the kernel to read the safetensors files ahead of memory-mapped access"""
+        total = 0
+        try:
+            for weight_file in sorted(Path(model_path).glob("*.safetensors")):
+                with open(weight_file, "rb") as f:
+                    size = os.fstat(f.fileno()).st_size
+                    if size == 0:
+                        continue
+                    if hasattr(os, "posix_fadvise"):
+                        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+                    else:
+                        # macOS has no posix_fadvise; an madvise readahead on
+                        # a read-only mapping has the same effect
+                        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                            mapped.madvise(mmap.MADV_WILLNEED)
+                    total += size
+        except (OSError, ValueError) as e:
+            # Only a hint; loading proceeds from disk if this fails
+            self.logger.debug(f"Weight prefetch stopped: {e}")
+        self.logger.debug(f"Requested readahead of {total / 1024 ** 2:.0f} MB of weights")
+
+    def _warmup(self):
+        """Run one prefill and one decode step to compile the language model's kernels"""
+        start = time.perf_counter()
+        self._generate_fn(
+            self._format_prompt("hi", 0),
+            [],
+            max_tokens=1,
+            temperature=0.0,
+            verbose=False,
+        )
+        self.logger.info(f"Warmed up {self.model_name} in {time.perf_counter() - start:.2f}s")
+
+    def _resolve_model_path(self, cache_dir: Optional[str] = None) -> str:
+        """Prefer a local copy under cache_dir over the Hub repo"""
+        local_path = Path(cache_dir or "~/.cache/mlx_models").expanduser() / self.model_name
+        if local_path.is_dir():
+            self.logger.debug(f"Using local model copy: {local_path}")
+            return str(local_path)
+        return f"mlx-community/{self.model_name}"
+
+    def _eval_embeddings(self):
+        """Materialize the embedding tables, which the first token always needs"""
+        from mlx.utils import tree_flatten
+
+        mx.eval([value for path, value in tree_flatten(self._model.parameters()) if "embed" in path])
+
+    def _quantize_vision_tower(self, bits: int, group_size: int = 64):
+        """Quantize the vision encoder's linear layers in place"""
+        # mlx_vlm models name the encoder vision_tower or vision_model
+        vision_tower = getattr(self._model, "vision_tower", None) or getattr(self._model, "vision_model", None)
+        if vision_tower is None:
+            self.logger.warning(f"No vision tower found for {self.model_name}; skipping encoder quantization")
+            return
+        self._quantize_module(vision_tower, bits, group_size)
+        self.logger.info(f"Quantized {self.model_name} vision tower to {bits}-bit")
+
+    def _cast_weights(self, dtype: Any):
+        """Cast floating point parameters to dtype, leaving quantized weights packed"""
+        # Scales and biases of quantized layers are floating point and get
+        # cast too, so dequantized matmuls also run in dtype
+        self._model.set_dtype(
+            dtype, predicate=lambda current: mx.issubdtype(current, mx.floating) and current != dtype
+        )
+
+    def _format_prompt(
+        self, prompt: str, num_images: int, system_prompt: Optional[str] = None
+    ) -> str:
+        """Apply the chat template, reusing results for repeated prompts"""
+        key = (system_prompt, prompt, num_images)
+        if key in self._template_cache:
+            return self._template_cache[key]
             
-        prompt = self.validate_input(prompt)
+        fast_template = None if system_prompt else self._FAST_TEMPLATES.get(self.model_enum)
+        if fast_template is not None and self._fast_template_ok.get(num_images):
+            formatted = fast_template(prompt, num_images)
+        else:
+            messages = [{"role": "user", "content": prompt}]
+            if system_prompt:
+                messages.insert(0, {"role": "system", "content": system_prompt})
+            formatted = self._template_fn(messages, num_images=num_images)
+
+            # The first render per image count decides whether the fast
+            # template matches this processor's Jinja template
+            if fast_template is not None and num_images not in self._fast_template_ok:
+                matches = fast_template(prompt, num_images) == formatted
+                self._fast_template_ok[num_images] = matches
+                if not matches:
+                    self.logger.debug(f"Fast chat template differs for {self.model_name}; using Jinja")
         
-        # Handle image input
-        if images is None:
-            images = []
-        elif isinstance(images, str):
-            images = [images]
+        # Evict the oldest entry once the cache is full
+        self._template_cache[key] = formatted
+        if len(self._template_cache) > self.TEMPLATE_CACHE_SIZE:
+            self._template_cache.popitem(last=False)
+        return formatted
         
-        # Validate image paths
-        validated_images = []
-        for img in images:
-            if isinstance(img, str) and Path(img).exists():
-                validated_images.append(img)
-            else:
-                self.logger.warning(f"Image not found: {img}")
-                
-        # Apply chat template
-        messages = [{"role": "user", "content": prompt}]
-        if system_prompt := kwargs.get("system_prompt"):
-            messages.insert(0, {"role": "system", "content": system_prompt})
+    def generate(self, prompt: str, images: Optional[Union[str, list[str]]] = None, **kwargs) -> str:
+        """
+        Generate response for prompt with optional images
+
+        With ``reuse_cache=True`` the KV cache is kept between calls: a call
+        with the same system prompt and images as the previous one continues
+        that conversation and only prefills the new user message. Any other
+        call starts a fresh cache. Use reset_cache() to start over explicitly.
+
+        Pass ``kv_window=`` with reuse_cache to bound the cache for long
+        sessions: once it holds that many tokens, the oldest are dropped
+        except for the first 4, which act as attention sinks.
+        """
+        if not self._model or not self._processor:
+            raise RuntimeError("Model not loaded. Call load() first.")
             
-        formatted_prompt = apply_chat_template(
-            self._processor, 
-            self._config, 
-            messages, 
-            num_images=len(validated_images)
+        formatted_prompt, validated_images, gen_kwargs = self._prepare_generation(
+            prompt, images, **kwargs
         )
         
-        # Merge config with kwargs
-        gen_kwargs = {
-            "max_tokens": 500,
-            "temperature": 0.8,
-            "top_p": 0.95,
-        }
-        gen_kwargs.update(self.config)
-        gen_kwargs.update(kwargs)
-        
         # Generate response
-        response = generate(
-            self._model, 
-            self._processor, 
+        response = self._generate_fn(
             formatted_prompt, 
             validated_images,
             verbose=gen_kwargs.pop("verbose", False),
@@ -91,51 +367,264 @@ class VLMDriver(BaseModelDriver):
         return response
         
     def stream(self, prompt: str, images: Optional[Union[str, List[str]]] = None, **kwargs) -> Generator[str, None, None]:
-        """Stream tokens as they're generated"""
+        """
+        Stream tokens as they're generated
+
+        By default tokens are produced on a background thread, so work the
+        caller does between tokens overlaps with computing the next one.
+        Pass ``background=False`` to generate on the calling thread.
+        """
         if not self._model or not self._processor:
             raise RuntimeError("Model not loaded. Call load() first.")
             
+        progressive = kwargs.pop("progressive", True)
+        background = kwargs.pop("background", True)
+        formatted_prompt, validated_images, gen_kwargs = self._prepare_generation(
+            prompt, images, **kwargs
+        )
+
+        # Stream generate
+        make_segments = partial(self._stream_fn, formatted_prompt, validated_images, **gen_kwargs)
+        segments = self._produce_in_background(make_segments) if background else make_segments()
+
+        # Progressive mode emits the first token immediately and then
+        # doubles the chunk size to keep time-to-first-token low. mlx_vlm
+        # detokenizes incrementally, so each segment holds only new text
+        if progressive:
+            yield from self._progressive_chunks(segments)
+        else:
+            for segment in segments:
+                yield segment.text
+
+    def _produce_in_background(self, make_segments: Callable[[], Iterable[Any]]) -> Generator[Any, None, None]:
+        """Iterate make_segments() on a worker thread and yield its items through a queue"""
+        segments: queue.Queue[Any] = queue.Queue()
+        stop = threading.Event()
+        done = object()
+
+        def produce():
+            try:
+                for segment in make_segments():
+                    if stop.is_set():
+                        break
+                    segments.put(segment)
+            except Exception as e:
+                segments.put(e)
+            finally:
+                segments.put(done)
+
+        thread = threading.Thread(target=produce, name="vlm-stream", daemon=True)
+        thread.start()
+        try:
+            while (segment := segments.get()) is not done:
+                if isinstance(segment, Exception):
+                    raise segment
+                yield segment
+        finally:
+            # The consumer stopped early or generation finished; either way
+            # let the producer wind down before the generator closes
+            stop.set()
+            thread.join()
+
+    def reset_cache(self):
+        """Drop the KV cache kept by reuse_cache=True calls"""
+        self._prompt_cache = None
+        self._cache_key = None
+
+    def _prepare_generation(
+        self, prompt: str, images: Optional[Union[str, list[str]]], **kwargs
+    ) -> tuple[str, list[Any], dict[str, Any]]:
+        """Validate inputs and build the formatted prompt, images and mlx_vlm kwargs"""
         prompt = self.validate_input(prompt)
+        reuse_cache = kwargs.pop("reuse_cache", False)
+        kv_window = kwargs.pop("kv_window", None)
+        system_prompt = kwargs.get("system_prompt")
+        if kv_window is not None and not reuse_cache:
+            # Without a kept cache there is nothing to bound
+            self.logger.warning("kv_window has no effect without reuse_cache=True; ignoring it")
+            kv_window = None
+
+        validated_images = self._validate_images(images)
+
+        # Apply chat template. A continued cache already holds the system
+        # prompt and image tokens, so only the new user turn is sent
+        if reuse_cache and self._continue_cache(validated_images, system_prompt, kv_window):
+            formatted_prompt = self._format_continuation(prompt)
+            validated_images = []
+        else:
+            # Decode images in the background while the template is rendered
+            pending = self._decode_images(validated_images)
+            formatted_prompt = self._format_prompt(
+                prompt, len(validated_images), system_prompt
+            )
+            validated_images = [
+                img.result() if isinstance(img, Future) else img for img in pending
+            ]
         
-        # Handle image input
-        if images is None:
-            images = []
-        elif isinstance(images, str):
-            images = [images]
+        # Merge config with kwargs
+        gen_kwargs = self._gen_defaults | kwargs
+        for key in self.PROMPT_KWARGS:
+            gen_kwargs.pop(key, None)
+        if reuse_cache:
+            gen_kwargs["prompt_cache"] = self._prompt_cache
+        if self._kv_bits is not None and kv_window is None:
+            # mlx_vlm swaps the cache for mlx's QuantizedKVCache during generation
+            gen_kwargs.setdefault("kv_bits", self._kv_bits)
+            gen_kwargs.setdefault("kv_group_size", 64)
+            gen_kwargs.setdefault("quantized_kv_start", self._kv_quant_start)
+
+        return formatted_prompt, validated_images, gen_kwargs
+
+    def _validate_images(self, images: Optional[Union[str, list[Any]]]) -> list[Any]:
+        """Drop image paths that do not exist; already decoded images pass through"""
+        images = self._coerce_images(images)
+
+        def check(img: Any) -> bool:
+            return not isinstance(img, str) or os.path.isfile(img)
+
+        # Stat calls overlap in a thread pool for larger batches, which helps
+        # on network filesystems; small batches are not worth the handoff
+        if len(images) >= 4:
+            found = list(_get_stat_pool().map(check, images))
+        else:
+            found = [check(img) for img in images]
             
-        # Validate image paths
         validated_images = []
-        for img in images:
-            if isinstance(img, str) and Path(img).exists():
+        for img, exists in zip(images, found):
+            if exists:
                 validated_images.append(img)
-                
-        # Apply chat template
-        messages = [{"role": "user", "content": prompt}]
-        formatted_prompt = apply_chat_template(
-            self._processor, 
-            self._config, 
-            messages, 
-            num_images=len(validated_images)
+            else:
+                self.logger.warning(f"Image not found: {img}")
+        return validated_images
+
+    def _decode_images(self, images: list[Any]) -> list[Any]:
+        """Start decoding image paths on the driver's image pool"""
+        if not any(isinstance(img, str) for img in images):
+            return images
+        if self._img_pool is None:
+            self._img_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="vlm-image")
+
+        # A path repeated within one prompt is decoded once and its image
+        # object reused for every slot
+        decoding: dict[str, Future] = {}
+        pending = []
+        for img in images:
+            if isinstance(img, str):
+                if img not in decoding:
+                    decoding[img] = self._img_pool.submit(load_image, img)
+                img = decoding[img]
+            pending.append(img)
+        return pending
+
+    def _continue_cache(
+        self, images: list[Any], system_prompt: Optional[str], kv_window: Optional[int] = None
+    ) -> bool:
+        """Return True if the kept cache matches this prefix, else start a new one"""
+        key = (system_prompt, tuple(self._image_key(img) for img in images), kv_window)
+        if self._prompt_cache is not None and key == self._cache_key:
+            return True
+
+        self._prompt_cache = self._make_prompt_cache(kv_window)
+        self._cache_key = key
+        return False
+
+    @staticmethod
+    def _image_key(img: Any) -> Any:
+        """Identify an image by path, or by a hash of its pixels once decoded"""
+        if isinstance(img, str):
+            return img
+        # Object ids are reused after garbage collection, so they cannot tell
+        # a new image from one that was freed
+        digest = hashlib.blake2b(img.tobytes(), digest_size=16).hexdigest()
+        return getattr(img, "size", None), getattr(img, "mode", None), digest
+
+    def _format_continuation(self, prompt: str) -> str:
+        """Render the next user turn alone, to follow the turns held in the KV cache"""
+        # Chat templates only render whole conversations, and some always add
+        # a default system prompt. Render one around a placeholder reply and
+        # keep what follows it: the reply's end-of-turn and the new user turn
+        marker = "PREVIOUS_REPLY"
+        formatted = self._template_fn(
+            [
+                {"role": "user", "content": "."},
+                {"role": "assistant", "content": marker},
+                {"role": "user", "content": prompt},
+            ],
+            num_images=0,
         )
+        return formatted[formatted.index(marker) + len(marker):]
         
-        # Merge config with kwargs
-        gen_kwargs = {
-            "max_tokens": 500,
-            "temperature": 0.8,
-            "top_p": 0.95,
-        }
-        gen_kwargs.update(self.config)
-        gen_kwargs.update(kwargs)
+    def _make_prompt_cache(self, kv_window: Optional[int]) -> list[Any]:
+        """Build a fresh KV cache, bounded to kv_window tokens if given"""
+        # A bounded cache is a rotating window that always keeps the first
+        # tokens as attention sinks, in the StreamingLLM manner; positions keep
+        # counting from the full history, so RoPE stays aligned
+        from mlx_vlm.models.cache import KVCache, RotatingKVCache, make_prompt_cache
         
-        # Stream generate
-        for token in stream_generate(
-            self._model,
-            self._processor,
-            formatted_prompt,
-            validated_images,
-            **gen_kwargs
-        ):
-            yield token
+        language_model = self._model.language_model
+        if kv_window is None or not hasattr(language_model, "make_cache"):
+            cache: list[Any] = make_prompt_cache(language_model, max_kv_size=kv_window)
+            return cache
+
+        # make_prompt_cache ignores max_kv_size for models with their own
+        # cache layout; plain KV caches can still be swapped for rotating ones
+        cache = language_model.make_cache()
+        if all(type(layer_cache) is KVCache for layer_cache in cache):
+            return [RotatingKVCache(max_size=kv_window, keep=4) for _ in cache]
+        self.logger.warning(f"{self.model_name} uses its own KV cache layout; ignoring kv_window")
+        return cache
+
+    def quantize(self, bits: int = 4, group_size: int = 64):
+        """Quantize the shared model weights in place"""
+        super().quantize(bits=bits, group_size=group_size)
+        if self._loaded is not None:
+            self._loaded.quant_bits = bits
+
+    def unload(self):
+        """Release this driver's hold on the shared model"""
+        super().unload()
+        self._loaded = None
+        self._config = None
+        self._generate_fn = self._stream_fn = self._template_fn = _not_loaded
+        self.reset_cache()
+
+    def preload_images(
+        self, images: Optional[Union[str, list[str]]], cache: Optional[dict[str, Any]] = None
+    ) -> list[Any]:
+        """Decode image paths once so repeated prompts can reuse the loaded images"""
+        images = self._coerce_images(images)
+        cache = {} if cache is None else cache
+
+        loaded = []
+        for img in images:
+            if not isinstance(img, str):
+                loaded.append(img)
+            elif img in cache:
+                loaded.append(cache[img])
+            elif os.path.isfile(img):
+                cache[img] = load_image(img)
+                loaded.append(cache[img])
+            else:
+                self.logger.warning(f"Image not found: {img}")
+        return loaded
+
+    def batch_generate(
+        self, prompts: list[str], images: Optional[Union[str, list[str]]] = None, **kwargs
+    ) -> list[str]:
+        """Process multiple prompts against the same images"""
+        loaded_images = self.preload_images(images)
+        return [self.generate(prompt, images=loaded_images, **kwargs) for prompt in prompts]
+
+    def _prepare_input(self, item: Any, cache: dict[str, Any], **kwargs) -> Any:
+        """Validate the prompt and decode its images ahead of generation"""
+        if not isinstance(item, dict):
+            item = {"prompt": item}
+        return self.validate_input(item.get("prompt", "")), self.preload_images(item.get("images"), cache)
+
+    def _generate_prepared(self, prepared: Any, **kwargs) -> str:
+        """Generate for a (prompt, decoded images) pair"""
+        prompt, images = prepared
+        return self.generate(prompt, images=images, **kwargs)
 
 
 def main():
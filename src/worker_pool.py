@@ -0,0 +1,146 @@
+import itertools
+import logging
+import multiprocessing as mp
+import queue
+from typing import Any, Union
+
+from .models import LLMs, VLMs, ALMs
+
+
+def _worker_main(tasks: Any, results: Any, log_level: str):
+    """Worker loop holding a warm UnifiedModelDriver for the process lifetime"""
+    from .unified_driver import UnifiedModelDriver
+
+    driver = UnifiedModelDriver(log_level=log_level)
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+
+        task_id, inputs, model_enum, kwargs = task
+        try:
+            responses = driver.batch_process(inputs, model_enum, **kwargs)
+        except Exception as e:
+            responses = [f"Error: {str(e)}"] * len(inputs)
+        results.put((task_id, responses))
+
+
+class WorkerPool:
+    """Pool of long-lived worker processes that keep models loaded between batches"""
+
+    # Seconds between worker liveness checks while waiting for results
+    POLL_INTERVAL = 1.0
+
+    def __init__(self, num_workers: int = 1, log_level: str = "INFO"):
+        """
+        Start the worker processes
+
+        Args:
+            num_workers: Number of worker processes. Each worker loads its own
+                copy of every model it is asked to run.
+            log_level: Logging level for the workers
+        """
+        if num_workers < 1:
+            raise ValueError("num_workers must be positive")
+
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.num_workers = num_workers
+        # Tags each batch_process call, so results left over from an
+        # interrupted call are told apart from the current call's
+        self._call_ids = itertools.count()
+
+        # spawn gives each worker a fresh MLX runtime instead of a forked copy
+        context = mp.get_context("spawn")
+        self._tasks = context.Queue()
+        self._results = context.Queue()
+        self._workers = [
+            context.Process(
+                target=_worker_main,
+                args=(self._tasks, self._results, log_level),
+                daemon=True
+            )
+            for _ in range(num_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+        self.logger.info(f"Started {num_workers} worker process(es)")
+
+    def batch_process(
+        self,
+        inputs: list[dict[str, Any]],
+        model_enum: Union[LLMs, VLMs, ALMs],
+        **kwargs
+    ) -> list[str]:
+        """
+        Distribute inputs round-robin across the workers
+
+        Args:
+            inputs: Inputs in the format accepted by UnifiedModelDriver.batch_process
+            model_enum: Model to use
+            **kwargs: Additional arguments for UnifiedModelDriver.batch_process
+
+        Returns:
+            List of responses in input order
+
+        Raises:
+            RuntimeError: A worker process exited, e.g. killed for running out
+                of memory. The pool is closed, since its tasks are lost.
+        """
+        if not self._workers:
+            raise RuntimeError("Worker pool is closed")
+
+        call_id = next(self._call_ids)
+        shards = [inputs[i::self.num_workers] for i in range(self.num_workers)]
+        pending = 0
+        for shard_index, shard in enumerate(shards):
+            if shard:
+                self._tasks.put(((call_id, shard_index), shard, model_enum, kwargs))
+                pending += 1
+
+        shard_results: dict[int, list[str]] = {}
+        while len(shard_results) < pending:
+            try:
+                (result_call_id, shard_index), responses = self._results.get(timeout=self.POLL_INTERVAL)
+            except queue.Empty:
+                self._check_workers()
+                continue
+            if result_call_id != call_id:
+                self.logger.debug(f"Dropping stale results from call {result_call_id}")
+                continue
+            shard_results[shard_index] = responses
+
+        # Every input belongs to exactly one shard, so all slots get filled
+        results: list[str] = [""] * len(inputs)
+        for shard_index, responses in shard_results.items():
+            results[shard_index::self.num_workers] = responses
+        return results
+
+    def _check_workers(self):
+        """Close the pool and raise if any worker process has exited"""
+        dead = [worker for worker in self._workers if not worker.is_alive()]
+        if not dead:
+            return
+
+        for worker in self._workers:
+            if worker.is_alive():
+                worker.terminate()
+            worker.join()
+        self._workers = []
+        raise RuntimeError(
+            f"Worker process {dead[0].pid} exited with code {dead[0].exitcode}; pool closed"
+        )
+
+    def close(self):
+        """Stop the worker processes"""
+        for _ in self._workers:
+            self._tasks.put(None)
+        for worker in self._workers:
+            worker.join()
+        self._workers = []
+        self.logger.info("Worker pool closed")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()